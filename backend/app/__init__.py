@@ -56,11 +56,14 @@ def load_audio_extensions(app):
 
         # Store as a global property on the Flask app
         app.audio_extensions = audio_extensions
+        # Undotted suffixes for O(1) extension lookups
+        app.audio_extension_set = frozenset(ext.lstrip(".") for ext in audio_extensions)
         app.logger.info(f"Audio extensions configuration loaded: {audio_extensions}")
 
     except Exception as e:
         app.logger.error(f"Failed to load audio extensions configuration: {str(e)}")
         app.audio_extensions = []
+        app.audio_extension_set = frozenset()
 
 
 def load_site_status(app):
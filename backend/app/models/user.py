@@ -22,7 +22,7 @@ class User(db.Model, TimestampMixin, DatabaseHelperMixin):
     org = db.Column(db.String(500))
     industry = db.Column(db.String(255))
     admin = db.Column(db.Boolean, default=False)
-    deleted = db.Column(db.String(100))
+    deleted = db.Column(DateTime(timezone=True))
     password_hash = db.Column(db.String(255), nullable=False)
     tokens_revoked_at = db.Column(
         DateTime(timezone=True)
@@ -1,5 +1,6 @@
 import os
 import zipfile
+from io import BytesIO
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import func, and_
 
@@ -352,7 +353,7 @@ class AdminUsersResource(Resource, AdminRequiredMixin):
 
             # Filter by deleted status
             if not include_deleted:
-                query = query.filter((User.deleted == None) | (User.deleted == ""))
+                query = query.filter(User.deleted.is_(None))
 
             # Filter by admin status
             if admin_only:
@@ -382,10 +383,9 @@ class AdminUsersResource(Resource, AdminRequiredMixin):
 
             # Serialize users
             if paginated_users.items:
-                from app.schemas import UserSchema
+                from app.schemas import users_schema
 
-                user_schema = UserSchema(many=True, exclude=["password_hash"])
-                users_data = user_schema.dump(paginated_users.items)
+                users_data = users_schema.dump(paginated_users.items)
             else:
                 users_data = []
 
@@ -456,24 +456,16 @@ class AdminDownloadsResource(Resource, AdminRequiredMixin):
             except ValueError:
                 return {"message": "user_limit must be in YYYY-MM-DD format"}, 400
 
-            generated_file = populate_users(
-                limit, include_deleted
-            )  # mongo is None for new implementation
+            # Build the workbook in memory so nothing is written to disk and re-read
+            buffer = populate_users(limit, include_deleted, output=BytesIO())
+            buffer.seek(0)
 
-            if not generated_file or not os.path.exists(generated_file):
-                return {"message": "Failed to generate user report"}, 500
-
-            try:
-                return send_file(
-                    generated_file,
-                    mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    as_attachment=True,
-                    download_name=f"users_{user_limit_str}.xlsx",
-                )
-            finally:
-                # Clean up temporary file
-                if os.path.exists(generated_file):
-                    os.remove(generated_file)
+            return send_file(
+                buffer,
+                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                as_attachment=True,
+                download_name=f"users_{user_limit_str}.xlsx",
+            )
 
         except Exception as e:
             log_exception(logger, "Failed to generate user download")
@@ -672,9 +664,7 @@ class AdminDashboardResource(Resource, AdminRequiredMixin):
             )
 
             # 1. Total users (excluding deleted)
-            total_users = User.query.filter(
-                (User.deleted == None) | (User.deleted == "")
-            ).count()
+            total_users = User.query.filter(User.deleted.is_(None)).count()
 
             # 2. Total size of uploaded files (sum of all task sizes)
             total_size_result = (
@@ -700,7 +690,7 @@ class AdminDashboardResource(Resource, AdminRequiredMixin):
             # or users without any revocation time
             active_users = User.query.filter(
                 and_(
-                    (User.deleted == None) | (User.deleted == ""),
+                    User.deleted.is_(None),
                     User.tokens_revoked_at < six_hour_ago,
                 )
             ).count()
@@ -708,7 +698,7 @@ class AdminDashboardResource(Resource, AdminRequiredMixin):
             # Also count users with no revocation time who have recent activity
             users_never_revoked = User.query.filter(
                 and_(
-                    (User.deleted == None) | (User.deleted == ""),
+                    User.deleted.is_(None),
                     User.tokens_revoked_at == None,
                     User.updated_at >= six_hour_ago,
                 )
@@ -767,7 +757,7 @@ class AdminDashboardResource(Resource, AdminRequiredMixin):
                 and_(
                     User.created_at >= today_start,
                     User.created_at <= today_end,
-                    (User.deleted == None) | (User.deleted == ""),
+                    User.deleted.is_(None),
                 )
             ).count()
 
@@ -18,7 +18,7 @@ from app.models.user import User
 from app.models.task import Task
 from app.extensions import db, bc
 from app.models.token_blacklist import TokenBlacklist
-from app.schemas import UserCreateSchema, UserLoginSchema, UserSchema, UserUpdateSchema
+from app.schemas import UserCreateSchema, UserLoginSchema, UserUpdateSchema, user_schema
 from app.utils.logger import (
     get_logger,
     log_exception,
@@ -96,7 +96,6 @@ class Register(Resource):
             refresh_token = create_refresh_token(identity=str(user.id))
 
             # Return user data (tokens will be set as HTTP-only cookies)
-            user_schema = UserSchema(exclude=["password_hash"])
             from flask import jsonify
 
             response = jsonify(
@@ -185,7 +184,6 @@ class Login(Resource):
             refresh_token = create_refresh_token(identity=str(user.id))
 
             # Return user data (tokens will be set as HTTP-only cookies)
-            user_schema = UserSchema(exclude=["password_hash"])
             from flask import jsonify
 
             response = jsonify(
@@ -456,7 +454,6 @@ class VerifyToken(Resource):
             if not user:
                 return {"message": "User not found or account deactivated"}, 404
 
-            user_schema = UserSchema(exclude=["password_hash"])
             return {"valid": True, "user": user_schema.dump(user)}, 200
 
         except Exception as e:
@@ -10,7 +10,8 @@ from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.extensions import db
 from app.models.task import Task, TaskStatus, FileType
-from app.utils.uploads import isAudioFile, fileOps
+from app.utils.helpers import is_audio_file
+from app.utils.uploads import fileOps
 
 load_dotenv()
 UPLOADS = os.getenv("UPLOADS")
@@ -386,7 +387,7 @@ class TaskReuploadInfoResource(Resource):
             if os.path.exists(task_dir):
                 for root, dirs, files in os.walk(task_dir):
                     for file in files:
-                        if isAudioFile(file):
+                        if is_audio_file(file):
                             expected_names.append(file)
                             break
 
@@ -17,15 +17,17 @@ from app.models.task import Task, TaskFile, TaskFileName
 
 logger = get_logger(__name__)
 from app.schemas import (
-    TaskSchema,
     TaskCreateSchema,
     TaskUpdateSchema,
     TaskSimpleSchema,
-    TaskFileSchema,
     TaskFileNameSchema,
     TaskFileCreateSchema,
     TaskFileNameCreateSchema,
     TaskStatus,
+    task_schema,
+    tasks_schema,
+    task_file_schema,
+    task_files_schema,
 )
 
 
@@ -95,7 +97,7 @@ class TaskListResource(Resource):
 
             tasks = query.all()
 
-            schema = TaskSchema(many=True)
+            schema = tasks_schema
             task_data = schema.dump(tasks)
 
             # Add cite information for anonymous users
@@ -160,7 +162,7 @@ class TaskListResource(Resource):
             task = Task(**data)
             task.insert()
 
-            response_schema = TaskSchema()
+            response_schema = task_schema
             return {
                 "message": "Task created successfully",
                 "task": response_schema.dump(task),
@@ -194,7 +196,7 @@ class TaskResource(Resource):
             if not current_user.admin and task.user_id != current_user_id:
                 return {"message": "Permission denied"}, 403
 
-            schema = TaskSchema()
+            schema = task_schema
             return {"task": schema.dump(task)}, 200
 
         except Exception as e:
@@ -224,7 +226,7 @@ class TaskResource(Resource):
 
             task.update()
 
-            response_schema = TaskSchema()
+            response_schema = task_schema
             return {
                 "message": "Task updated successfully",
                 "task": response_schema.dump(task),
@@ -279,7 +281,7 @@ class TaskFilesResource(Resource):
             if not current_user.admin and task.user_id != current_user_id:
                 return {"message": "Permission denied"}, 403
 
-            schema = TaskFileSchema(many=True)
+            schema = task_files_schema
             return {"files": schema.dump(task.files), "count": len(task.files)}, 200
 
         except Exception as e:
@@ -308,7 +310,7 @@ class TaskFilesResource(Resource):
             task_file = TaskFile(**data)
             task_file.insert()
 
-            response_schema = TaskFileSchema()
+            response_schema = task_file_schema
             return {
                 "message": "File added to task successfully",
                 "file": response_schema.dump(task_file),
@@ -422,7 +424,7 @@ class TaskCancelResource(Resource):
 
             task.update()
 
-            schema = TaskSchema()
+            schema = task_schema
             return {
                 "message": "Task cancelled successfully",
                 "task": schema.dump(task),
@@ -607,7 +609,7 @@ class TaskHistoryResource(Resource):
             )
 
             # Format results
-            schema = TaskSchema(many=True)
+            schema = tasks_schema
             task_data = schema.dump(tasks)
 
             # Calculate totals
@@ -9,11 +9,11 @@ from flask import request, session, current_app, make_response
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 
 from app.models.user import User
-from app.schemas.task import TaskSchema
+from app.schemas.task import tasks_schema
 from app.utils.logger import get_logger, log_exception
 from app.models.task import Task, TaskStatus, TaskFile, FileType
+from app.utils.helpers import is_audio_file
 from app.utils.uploads import (
-    isAudioFile,
     transcription_mode,
     extract_upload_zip,
 )
@@ -254,7 +254,7 @@ class FileUploadResource(Resource):
                         for file_path in group:
                             file_type = (
                                 FileType.AUDIO
-                                if isAudioFile(file_path)
+                                if is_audio_file(file_path)
                                 else FileType.TEXTGRID
                             )
                             task_file = TaskFile(
@@ -357,7 +357,7 @@ class FileUploadResource(Resource):
                         create_task_files(task, group)
 
                 # Prepare response
-                schema = TaskSchema(many=True)
+                schema = tasks_schema
                 response_data = {
                     "success": True,
                     "message": f"Successfully uploaded {len(grouped_files)} file group(s)",
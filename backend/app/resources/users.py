@@ -8,7 +8,12 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.user import User
 from app.utils.logger import get_logger, log_exception
-from app.schemas import UserSchema, UserCreateSchema, UserUpdateSchema, UserPublicSchema
+from app.schemas import (
+    user_schema,
+    UserCreateSchema,
+    UserUpdateSchema,
+    UserPublicSchema,
+)
 
 logger = get_logger(__name__)
 
@@ -58,7 +63,7 @@ class UserListResource(Resource):
             user.insert()
 
             # Return user data
-            schema = UserSchema(exclude=["password_hash"])
+            schema = user_schema
             return {
                 "message": "User created successfully",
                 "user": schema.dump(user),
@@ -91,7 +96,7 @@ class UserResource(Resource):
             if not user:
                 return {"message": "User not found"}, 404
 
-            schema = UserSchema(exclude=["password_hash"])
+            schema = user_schema
             return {"user": schema.dump(user)}, 200
 
         except Exception as e:
@@ -121,7 +126,7 @@ class UserResource(Resource):
 
             user.update()
 
-            response_schema = UserSchema(exclude=["password_hash"])
+            response_schema = user_schema
             return {
                 "message": "User updated successfully",
                 "user": response_schema.dump(user),
@@ -150,7 +155,7 @@ class UserResource(Resource):
             # Soft delete
             from app.utils.datetime_helpers import utc_now
 
-            user.deleted = utc_now().isoformat()
+            user.deleted = utc_now()
             user.update()
 
             return {"message": "User deleted successfully"}, 200
@@ -173,7 +178,7 @@ class UserProfileResource(Resource):
             if not user:
                 return {"message": "User not found"}, 404
 
-            schema = UserSchema(exclude=["password_hash"])
+            schema = user_schema
             return {"user": schema.dump(user)}, 200
 
         except Exception as e:
@@ -199,7 +204,7 @@ class UserProfileResource(Resource):
 
             user.update()
 
-            response_schema = UserSchema(exclude=["password_hash"])
+            response_schema = user_schema
             return {
                 "message": "Profile updated successfully",
                 "user": response_schema.dump(user),
@@ -1,10 +1,13 @@
 # User schemas
 from .user import (
     UserSchema,
+    UserWithTasksSchema,
     UserCreateSchema,
     UserUpdateSchema,
     UserLoginSchema,
     UserPublicSchema,
+    user_schema,
+    users_schema,
 )
 
 # Language schemas
@@ -41,6 +44,10 @@ from .task import (
     TaskFileNameCreateSchema,
     TaskStatus,
     FileType,
+    task_schema,
+    tasks_schema,
+    task_file_schema,
+    task_files_schema,
 )
 
 # Dictionary schemas
@@ -54,10 +61,13 @@ from .dictionary import (
 __all__ = [
     # User schemas
     "UserSchema",
+    "UserWithTasksSchema",
     "UserCreateSchema",
     "UserUpdateSchema",
     "UserLoginSchema",
     "UserPublicSchema",
+    "user_schema",
+    "users_schema",
     # Language schemas
     "LanguageSchema",
     "LanguageCreateSchema",
@@ -85,6 +95,10 @@ __all__ = [
     "TaskFileNameCreateSchema",
     "TaskStatus",
     "FileType",
+    "task_schema",
+    "tasks_schema",
+    "task_file_schema",
+    "task_files_schema",
     # Dictionary schemas
     "DictionarySchema",
     "DictionaryCreateSchema",
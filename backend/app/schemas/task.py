@@ -1,3 +1,5 @@
+import os
+
 from marshmallow import Schema, fields, validate
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
@@ -5,6 +7,26 @@ from app.utils.helpers import missing_word_html
 from app.models.task import Task, TaskFile, TaskFileName, TaskStatus, FileType
 
 
+class FastEnumField(fields.Enum):
+    """Enum field (de)serialized by value using a prebuilt value -> member table"""
+
+    def __init__(self, enum, **kwargs):
+        kwargs["by_value"] = True
+        super().__init__(enum, **kwargs)
+        self._value_map = {member.value: member for member in enum}
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        return value.value if value is not None else None
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, self.enum):
+            return value
+        try:
+            return self._value_map[value]
+        except (KeyError, TypeError) as error:
+            raise self.make_error("unknown", choices=self.choices_text) from error
+
+
 class TaskFileSchema(SQLAlchemyAutoSchema):
     """Schema for TaskFile model"""
 
@@ -12,7 +34,7 @@ class TaskFileSchema(SQLAlchemyAutoSchema):
         model = TaskFile
         load_instance = True
 
-    file_type = fields.Enum(FileType, by_value=True)
+    file_type = FastEnumField(FileType)
 
 
 class TaskFileNameSchema(SQLAlchemyAutoSchema):
@@ -32,7 +54,7 @@ class TaskSchema(SQLAlchemyAutoSchema):
         exclude = ("final_temp", "log_path", "download_path")
 
     # Enum field
-    task_status = fields.Enum(TaskStatus, by_value=True)
+    task_status = FastEnumField(TaskStatus)
 
     # Decimal field
     size = fields.Decimal(as_string=True)
@@ -49,18 +71,21 @@ class TaskSchema(SQLAlchemyAutoSchema):
 
     def get_relative_missingprondict(self, obj: Task):
         """Convert absolute path to relative path for missingprondict"""
-        if obj.missingprondict:
-            # Extract just the filename or make it relative to a base path
-            import os
+        if not obj.missingprondict:
+            return None
 
-            return os.path.basename(obj.missingprondict)
-        return None
+        # Extract just the filename or make it relative to a base path
+        return os.path.basename(obj.missingprondict)
 
     def format_to_html(self, obj: Task):
         """Convert missing words to HTML"""
-        import os
+        # Check in-memory attributes before touching the filesystem
+        if not obj.missing_words or not obj.missingprondict:
+            return None
 
-        if obj.missing_words and os.path.exists(obj.missingprondict):
+        if os.path.exists(obj.missingprondict):
+            # The file is appended once per file group and can repeat words,
+            # so number its own lines rather than trusting missing_words
             with open(obj.missingprondict, "r", encoding="utf-8") as f:
                 content = f.readlines()
 
@@ -68,6 +93,13 @@ class TaskSchema(SQLAlchemyAutoSchema):
             return missing_word_html(content, seperator=False)
 
 
+# Shared instances - reuse these for dumping instead of building a schema per request
+task_schema = TaskSchema()
+tasks_schema = TaskSchema(many=True)
+task_file_schema = TaskFileSchema()
+task_files_schema = TaskFileSchema(many=True)
+
+
 class TaskCreateSchema(Schema):
     """Schema for creating new tasks"""
 
@@ -86,7 +118,7 @@ class TaskCreateSchema(Schema):
 class TaskUpdateSchema(Schema):
     """Schema for updating existing tasks"""
 
-    task_status = fields.Enum(TaskStatus, by_value=True)
+    task_status = FastEnumField(TaskStatus)
     anonymous = fields.Bool()
     trans_choice = fields.Str(validate=validate.Length(max=50))
     task_path = fields.Str(validate=validate.Length(max=500))
@@ -111,7 +143,7 @@ class TaskSimpleSchema(Schema):
 
     id = fields.Int(dump_only=True)
     task_id = fields.Str(dump_only=True)
-    task_status = fields.Enum(TaskStatus, by_value=True, dump_only=True)
+    task_status = FastEnumField(TaskStatus, dump_only=True)
     anonymous = fields.Bool(dump_only=True)
     size = fields.Decimal(as_string=True, dump_only=True)
     words = fields.Int(dump_only=True)
@@ -122,7 +154,7 @@ class TaskFileCreateSchema(Schema):
     """Schema for creating task files"""
 
     task_id = fields.Int(required=True)
-    file_type = fields.Enum(FileType, by_value=True, required=True)
+    file_type = FastEnumField(FileType, required=True)
     file_path = fields.Str(required=True, validate=validate.Length(min=1, max=1000))
     original_filename = fields.Str(validate=validate.Length(max=255))
     file_key = fields.Str(validate=validate.Length(max=100))
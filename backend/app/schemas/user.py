@@ -19,12 +19,6 @@ class UserSchema(SQLAlchemyAutoSchema):
     display_name = fields.Method("get_display_name", dump_only=True)
     profile_image = fields.Method("get_profile_image", dump_only=True)
 
-    # Nested relationships (optional)
-    tasks = fields.Nested("TaskSchema", many=True, dump_only=True, exclude=("owner",))
-    dictionaries = fields.Nested(
-        "DictionarySchema", many=True, dump_only=True, exclude=("owner",)
-    )
-
     def get_display_name(self, obj):
         return obj.display_name()
 
@@ -32,6 +26,24 @@ class UserSchema(SQLAlchemyAutoSchema):
         return obj.profile_image()
 
 
+# Shared instances - reuse these for dumping instead of building a schema per request
+user_schema = UserSchema(exclude=["password_hash"])
+users_schema = UserSchema(many=True, exclude=["password_hash"])
+
+
+class UserWithTasksSchema(UserSchema):
+    """Schema for User model including nested tasks and dictionaries.
+
+    Only use where the collections are actually needed; every dump walks
+    all of the user's tasks and dictionaries.
+    """
+
+    tasks = fields.Nested("TaskSchema", many=True, dump_only=True, exclude=("owner",))
+    dictionaries = fields.Nested(
+        "DictionarySchema", many=True, dump_only=True, exclude=("owner",)
+    )
+
+
 class UserCreateSchema(Schema):
     """Schema for creating new users"""
 
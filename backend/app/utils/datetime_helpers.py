@@ -18,3 +18,30 @@ def make_utc_aware(dt):
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
     return dt
+
+
+# Stands in for a legacy deletion marker that can't be parsed, so the account
+# still reads as deleted
+UNKNOWN_DELETED_AT = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Formats `users.deleted` was written in while it was a string column
+LEGACY_DELETED_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d - %H:%M:%S")
+
+
+def parse_legacy_deleted(value):
+    """Parse a legacy string `users.deleted` marker to a timezone-aware datetime\n
+    Empty markers mean the user is not deleted and return None. Any other
+    marker that can't be parsed returns `UNKNOWN_DELETED_AT`.
+    """
+    value = str(value or "").strip()
+    if not value:
+        return None
+    for fmt in LEGACY_DELETED_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    try:
+        return make_utc_aware(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        return UNKNOWN_DELETED_AT
@@ -5,18 +5,25 @@
 # Standard library imports
 import os
 import codecs
+import importlib.util
 import shutil
 import string
+import time
 import random
+import threading
 import subprocess
 import unicodedata
+from typing import BinaryIO
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 from app.utils.datetime_helpers import utc_now
 
 # Third-party imports
 import charset_normalizer
 from praatio import textgrid
+from flask import current_app
 from dotenv import load_dotenv
+from sqlalchemy import String, cast, delete, literal, select, update
 from PIL import Image, ImageDraw, ImageFont
 from openpyxl import load_workbook, Workbook
 from openpyxl.utils import get_column_letter
@@ -38,24 +45,73 @@ ADMIN = os.getenv("ADMIN")
 
 logger = get_logger(__name__)
 
+# Column headers for the admin Excel exports
+USERS_EXPORT_COLUMNS = [
+    "User ID",
+    "Title",
+    "First Name",
+    "Last Name",
+    "Email",
+    "Date Created",
+    "Verified",
+    "Date Deleted",
+    "Affiliation",
+]
+HISTORY_EXPORT_COLUMNS = [
+    "user_id",
+    "upload_id",
+    "task_id",
+    "date",
+    "file_pairs",
+    "language",
+    "size",
+    "words",
+    "status",
+    "deleted",
+]
+
+# LibreOffice UNO listener used for spreadsheet -> PDF conversion
+UNO_HOST = os.getenv("UNO_HOST", "localhost")
+UNO_PORT = int(os.getenv("UNO_PORT", "2002"))
+
+ICON_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+ICON_FONT_SIZE = 100
+
+# Template image and font are loaded once and reused for every icon.
+# PIL objects aren't safe to share across threads, so access is serialized.
+_icon_lock = threading.Lock()
+_icon_template_image = None
+
+# Connection to the persistent soffice process, shared by all conversions
+_uno_lock = threading.Lock()
+_uno_desktop = None
+
 # ==============================================================================
 # USER PROFILE & AUTH & ICON FUNCTIONS
 # ==============================================================================
 
 
-def generate_user_icon(name, user_id, force=False):
-    """Generate user profile icon with initials"""
-    image_path = os.path.join(UPLOADS, user_id, "profile.png")
-    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+@lru_cache(maxsize=1)
+def _icon_font():
+    """Load the profile icon font once"""
+    return ImageFont.truetype(ICON_FONT_PATH, ICON_FONT_SIZE)
+
 
-    if not os.path.exists(image_path) or force:
-        # Load the template image
+def _icon_template():
+    """Return a fresh copy of the profile icon template image"""
+    global _icon_template_image
+
+    if _icon_template_image is None:
         template_path = os.path.join(ADMIN, "profile_template.png")
-        image = Image.open(template_path).convert("RGBA")
+        _icon_template_image = Image.open(template_path).convert("RGBA")
+    return _icon_template_image.copy()
+
 
-        # Create a drawing context
-        draw = ImageDraw.Draw(image)
+def generate_user_icon(name, user_id, force=False):
+    """Generate user profile icon with initials"""
+    image_path = os.path.join(UPLOADS, user_id, "profile.png")
 
+    if force or not os.path.isfile(image_path):
         # Get the user's initials
         name_parts = name.split()
         if len(name_parts) >= 2:
@@ -63,27 +119,30 @@ def generate_user_icon(name, user_id, force=False):
         else:
             initials = name[:4] if len(name) >= 4 else name
 
-        # Define the font size and type
-        font_size = 100
-        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-        font = ImageFont.truetype(font_path, font_size)
+        with _icon_lock:
+            image = _icon_template()
+            font = _icon_font()
 
-        # Get the size of the image and the text
-        image_width, image_height = image.size
+            # Create a drawing context
+            draw = ImageDraw.Draw(image)
 
-        # Use textbbox instead of deprecated textsize
-        bbox = draw.textbbox((0, 0), initials, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
+            # Get the size of the image and the text
+            image_width, image_height = image.size
 
-        # Calculate the position to center the text on the image
-        x = (image_width - text_width) / 2 + 5
-        y = (image_height - text_height) / 2 - 10
+            # Measure the text from the font metrics directly
+            left, top, right, bottom = font.getbbox(initials)
+            text_width = right - left
+            text_height = bottom - top
 
-        # Draw the initials on the image
-        draw.text((x, y), initials, font=font, fill="black")
+            # Calculate the position to center the text on the image
+            x = (image_width - text_width) / 2 + 5
+            y = (image_height - text_height) / 2 - 10
+
+            # Draw the initials on the image
+            draw.text((x, y), initials, font=font, fill="black")
 
         # Save to user folder
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
         image.save(image_path)
 
     return os.path.relpath(image_path)
@@ -111,6 +170,7 @@ def generate_captcha() -> tuple:
 def missing_word_html(word_list, seperator=True) -> str:
     """Generate HTML for missing word display"""
     logger.debug("Generating missing word html")
+    total_digits = len(str(len(word_list)))
     html_code = ""
     for i, word in enumerate(word_list, start=1):
         word_parts = word.split("\t")
@@ -128,7 +188,7 @@ def missing_word_html(word_list, seperator=True) -> str:
                         f"<span class='text-accent'>{phoneme}</span>"
                     )
             colored_phoneme_str = " ".join(colored_phonemes)
-            n_digits = len(str(len(word_list))) - len(str(i))
+            n_digits = total_digits - len(str(i))
             spaces = "".join(["&nbsp;"] * n_digits)
             if seperator:
                 word_text = f"""<span><span class="after:content-['\\2502'] after:text-xl after:leading-3">{spaces}{i} </span> {word_text}</span>"""
@@ -222,21 +282,115 @@ def get_font(font_size: int = 8, bold=None, gray=None) -> Font:
     return font
 
 
+def _start_soffice_listener():
+    """Launch a headless LibreOffice process accepting UNO connections"""
+    logger.info(f"Starting soffice UNO listener on {UNO_HOST}:{UNO_PORT}")
+    subprocess.Popen(
+        [
+            "soffice",
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--norestore",
+            f"--accept=socket,host={UNO_HOST},port={UNO_PORT};urp;",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _get_uno_desktop(retries: int = 20):
+    """Return the LibreOffice desktop, connecting (and starting soffice) if needed"""
+    global _uno_desktop
+
+    if _uno_desktop is not None:
+        return _uno_desktop
+
+    import uno
+
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_context
+    )
+    url = f"uno:socket,host={UNO_HOST},port={UNO_PORT};urp;StarOffice.ComponentContext"
+
+    for attempt in range(retries):
+        try:
+            context = resolver.resolve(url)
+            break
+        except Exception:
+            # No listener yet - start one and give it time to come up
+            if attempt == 0:
+                _start_soffice_listener()
+            time.sleep(0.5)
+    else:
+        raise ConnectionError(f"Could not connect to soffice at {UNO_HOST}:{UNO_PORT}")
+
+    _uno_desktop = context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.frame.Desktop", context
+    )
+    return _uno_desktop
+
+
+def _uno_excel_to_pdf(input_file, output_file):
+    """Convert a spreadsheet to PDF through the persistent soffice process"""
+    import uno
+    from com.sun.star.beans import PropertyValue
+
+    def make_property(name, value):
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        return prop
+
+    desktop = _get_uno_desktop()
+    document = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(input_file)),
+        "_blank",
+        0,
+        (make_property("Hidden", True),),
+    )
+    try:
+        document.storeToURL(
+            uno.systemPathToFileUrl(os.path.abspath(output_file)),
+            (make_property("FilterName", "calc_pdf_Export"),),
+        )
+    finally:
+        document.close(True)
+
+
 def excel_to_pdf(input_file, output_file) -> bool:
     """Convert Excel file to PDF using LibreOffice"""
-    # run these 2 commands first
-    # make sure libreoffice and unconv are installed
+    # make sure libreoffice is installed and uno is importable
 
     # ln -s /usr/lib/python3/dist-packages/uno.py /path/to/your/virtualenv/lib/python3.8/site-packages/uno.py
     # ln -s /usr/lib/python3/dist-packages/unohelper.py /path/to/your/virtualenv/lib/python3.8/site-packages/unohelper.py
+    global _uno_desktop
+
+    if importlib.util.find_spec("uno") is None:
+        # Fall back to a one-off unoconv process per conversion
+        logger.warning("uno not available, falling back to unoconv")
+        env = dict(os.environ)
+        env["PYTHON"] = shutil.which("python") or ""
+        env["UNOPATH"] = shutil.which("libreoffice") or ""
+        process = subprocess.run(
+            ["/usr/bin/unoconv", "-f", "pdf", "-o", output_file, input_file], env=env
+        )
+        return process.returncode == 0
 
-    command = f"PYTHON=$(eval 'which python') UNOPATH=$(eval 'which libreoffice') /usr/bin/unoconv -f pdf -o {output_file} {input_file}"
-    process = subprocess.run(command, shell=True, executable="/bin/bash")
+    with _uno_lock:
+        # Retry once on a fresh connection if soffice went away
+        for attempt in range(2):
+            try:
+                _uno_excel_to_pdf(input_file, output_file)
+                return True
+            except Exception as e:
+                logger.warning(f"UNO conversion attempt {attempt + 1} failed: {e}")
+                _uno_desktop = None
 
-    if process.returncode == 0:
-        return True
-    else:
-        return False
+    logger.error(f"Failed to convert {input_file} to PDF")
+    return False
 
 
 def get_monthly_download(user_id, date, task_list: list, totals: dict):
@@ -307,17 +461,18 @@ def get_monthly_download(user_id, date, task_list: list, totals: dict):
     sheet[f"B{total_row}"] = "Total usage"
     sheet[f"B{total_row}"].alignment = vertical_alignment
 
-    sheet[f"C{total_row}"].font = get_font(bold=True)
+    sheet[f"C{total_row}"].font = get_font()
     sheet[f"C{total_row}"] = totals["file_count"]
     sheet[f"C{total_row}"].alignment = alignment
 
-    sheet[f"D{total_row}"].font = get_font(bold=True)
+    sheet[f"D{total_row}"].font = get_font()
     sheet[f"D{total_row}"] = totals["total_size"]
     sheet[f"D{total_row}"].alignment = alignment
 
+    sheet[f"E{total_row}"].font = get_font()
     sheet[f"E{total_row}"] = ""
 
-    sheet[f"F{total_row}"].font = get_font(bold=True)
+    sheet[f"F{total_row}"].font = get_font()
     sheet[f"F{total_row}"].alignment = alignment
 
     # write in totals box
@@ -331,9 +486,11 @@ def get_monthly_download(user_id, date, task_list: list, totals: dict):
     for i, item in enumerate(sorted(totals["lang_count"].keys())):
         cur_index = totals_box + i
         # language
+        sheet[f"E{cur_index}"].font = get_font()
         sheet[f"E{cur_index}"].value = item
         sheet[f"E{cur_index}"].alignment = alignment
         # count
+        sheet[f"F{cur_index}"].font = get_font()
         sheet[f"F{cur_index}"].value = totals["lang_count"][item]
         sheet[f"F{cur_index}"].alignment = alignment
         if i != len(totals["lang_count"].keys()) + 1:
@@ -372,30 +529,17 @@ def get_monthly_download(user_id, date, task_list: list, totals: dict):
     sheet[f"A{footer_row + 1}"].alignment = alignment
     sheet[f"A{footer_row + 1}"].font = get_font()
 
-    # change font
-    # get last row
-    last_row = None
-    for row in reversed(list(sheet.iter_rows())):
-        for cell in row:
-            if cell.value:
-                last_row = cell.row
-                break
-        if last_row:
-            break
-
+    # change font of the template labels around the totals box
+    font = get_font()
     for row in sheet.iter_rows(
-        min_row=10, max_row=last_row, min_col=3, max_col=sheet.max_column
+        min_row=total_row, max_row=footer_row - 1, min_col=3, max_col=sheet.max_column
     ):
         for cell in row:
-            cell.font = get_font()
+            cell.font = font
 
     # auto align
-    for column in sheet.iter_cols(
-        min_row=10, max_row=last_row, min_col=3, max_col=sheet.max_column
-    ):
-        sheet.column_dimensions[f"{get_column_letter(column[0].column)}"].auto_size = (
-            True
-        )
+    for col_num in range(3, sheet.max_column + 1):
+        sheet.column_dimensions[get_column_letter(col_num)].auto_size = True
 
     sheet.merge_cells(f"A{footer_row}:G{footer_row}")
     sheet.merge_cells(f"A{footer_row + 1}:G{footer_row + 1}")
@@ -423,58 +567,119 @@ def get_monthly_download(user_id, date, task_list: list, totals: dict):
 # ==============================================================================
 
 
-def purge_unverified_accounts(timeframe: int = 48):
+def purge_unverified_accounts(timeframe: int = 48, batch_size: int = 500):
     """Delete unverified accounts from SQLAlchemy database after `timeframe` in hours\n
+    Accounts are deleted in batches of `batch_size` with one commit per batch.
     Should be called withing an app context.
     """
     from app.models.user import User
 
     cutoff_time = datetime.now(timezone.utc) - timedelta(hours=timeframe)
 
-    # Find unverified users older than timeframe
-    unverified_users = User.query.filter(
-        User.verified == False, User.created_at < cutoff_time
-    ).all()
+    # Find unverified users older than timeframe - only the columns we need
+    unverified_users = (
+        User.query.with_entities(User.id, User.uuid)
+        .filter(
+            User.verified == False,
+            User.created_at < cutoff_time,
+            User.deleted.is_(None),
+        )
+        .order_by(User.id)
+        .all()
+    )
 
     deleted_count = 0
-    for user in unverified_users:
+    min_id = max_id = None
+    deleted_at = datetime.now(timezone.utc)
+    for start in range(0, len(unverified_users), batch_size):
+        batch = unverified_users[start : start + batch_size]
+        user_ids = [user.id for user in batch]
         try:
-            logger.info(f"Deleting unverified account: {user.email} (ID: {user.id})")
-            delete_user_account(user.id)
-            deleted_count += 1
+            for user in batch:
+                logger.debug(
+                    "Deleting unverified account: %s (ID: %s)", user.uuid, user.id
+                )
+            _soft_delete_users(user_ids, deleted_at)
+            db.session.commit()
         except Exception as e:
-            logger.error(f"Failed to delete user {user.id}: {e}")
+            db.session.rollback()
+            logger.error(f"Failed to delete users {user_ids[0]}-{user_ids[-1]}: {e}")
+            continue
 
-    logger.info(f"Purged {deleted_count} unverified accounts")
+        # Delete user folders
+        for user in batch:
+            shutil.rmtree(os.path.join(UPLOADS, str(user.uuid)), ignore_errors=True)
+        deleted_count += len(batch)
+        if min_id is None:
+            min_id = user_ids[0]
+        max_id = user_ids[-1]
+
+    if deleted_count:
+        logger.info(
+            f"Purged {deleted_count} unverified accounts in [{min_id}..{max_id}]"
+        )
+    else:
+        logger.info("Purged 0 unverified accounts")
     return deleted_count
 
 
+def _soft_delete_users(user_ids: list, deleted_at: datetime):
+    """Anonymize users and delete their tasks in bulk. Caller commits."""
+    from app.models.user import User
+    from app.models.task import Task, TaskFile, TaskFileName
+
+    # Mark users as deleted instead of hard delete for data integrity
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(
+            title="deleted",
+            first_name="deleted",
+            last_name="deleted",
+            email=literal("deleted_") + cast(User.id, String) + "@deleted.com",
+            deleted=deleted_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    # Delete associated tasks - bulk deletes skip ORM cascades, so clear children first
+    task_ids = select(Task.id).where(Task.user_id.in_(user_ids))
+    db.session.execute(
+        delete(TaskFile)
+        .where(TaskFile.task_id.in_(task_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        delete(TaskFileName)
+        .where(TaskFileName.task_id.in_(task_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        delete(Task)
+        .where(Task.user_id.in_(user_ids))
+        .execution_options(synchronize_session=False)
+    )
+
+
 def delete_user_account(user_id: int):
     """Delete user account and associated data using SQLAlchemy"""
     from app.models.user import User
-    from app.models.task import Task
 
     try:
         user = User.query.get(user_id)
         if not user:
             logger.warning(f"User {user_id} not found")
             return False
+        user_uuid = str(user.uuid)
 
-        # Mark user as deleted instead of hard delete for data integrity
-        user.title = "deleted"
-        user.first_name = "deleted"
-        user.last_name = "deleted"
-        user.email = f"deleted_{user_id}@deleted.com"
-        user.deleted = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-        user.update()
-
-        # Delete associated tasks (cascade should handle this, but explicit is better)
-        Task.query.filter_by(user_id=user_id).delete()
+        # Mark user as deleted and delete associated tasks in one transaction
+        deleted_at = datetime.now(timezone.utc)
+        _soft_delete_users([user_id], deleted_at)
+        db.session.commit()
 
-        # Delete user folders
-        delete_folders(UPLOADS, str(user.uuid))
+        # Delete user folder - everything a user owns lives under UPLOADS/<uuid>
+        shutil.rmtree(os.path.join(UPLOADS, user_uuid), ignore_errors=True)
 
-        db.session.commit()
         logger.info(f"Successfully deleted user account {user_id}")
         return True
 
@@ -485,9 +690,15 @@ def delete_user_account(user_id: int):
 
 
 def populate_users(
-    limit: datetime, include_deleted: bool = False, filename: str = None
+    limit: datetime,
+    include_deleted: bool = False,
+    filename: str = None,
+    output: BinaryIO = None,
 ):
-    """Export users to Excel file using SQLAlchemy - matches original populate_users function signature"""
+    """Export users to Excel file using SQLAlchemy - matches original populate_users function signature\n
+    When `output` (a binary file-like) is given the workbook is written to it
+    instead of disk and `output` is returned.
+    """
     from app.models.user import User
 
     new_filename = (
@@ -496,59 +707,84 @@ def populate_users(
         else filename
     )
 
-    # Create Excel file
-    new_workbook_path = create_users_excel_template(new_filename)
-    new_workbook = load_workbook(new_workbook_path)
-    new_sheet = new_workbook.active
-
-    # Query users with date limit (registered/created_at <= limit)
-    query = User.query.filter(User.created_at <= limit)
+    # Create Excel file - write-only mode streams rows instead of keeping every cell
+    new_workbook, new_workbook_path = create_users_excel_template(new_filename)
+    new_sheet = new_workbook.worksheets[0]
+
+    # Query users with date limit (registered/created_at <= limit).
+    # Only the exported columns are selected so no ORM objects are hydrated.
+    query = select(
+        User.uuid,
+        User.title,
+        User.first_name,
+        User.last_name,
+        User.email,
+        User.created_at,
+        User.verified,
+        User.deleted,
+        User.org,
+        User.industry,
+    ).where(User.created_at <= limit)
 
     # Apply deleted filter based on include_deleted parameter
     if not include_deleted:
-        query = query.filter((User.deleted == None) | (User.deleted == ""))
+        query = query.where(User.deleted.is_(None))
 
     # Sort by registration date (created_at) ascending to match original
-    users = query.order_by(User.created_at).all()
+    # Stream users in batches instead of loading them all at once
+    users = db.session.execute(
+        query.order_by(User.created_at).execution_options(
+            stream_results=True, yield_per=1000
+        )
+    )
 
     # Add user data to Excel - maintaining original data structure
-    for user in users:
-        deleted_date = None
-        if user.deleted and user.deleted != "":
-            try:
-                # Try to parse as datetime string and format for Excel
-                deleted_date = datetime.strptime(
-                    user.deleted, "%Y-%m-%d %H:%M:%S"
-                ).strftime("%m/%d/%Y %H:%M:%S")
-            except:
-                # Fallback to original string if parsing fails
-                deleted_date = user.deleted
-
+    user_count = 0
+    for (
+        uuid,
+        title,
+        first_name,
+        last_name,
+        email,
+        created_at,
+        verified,
+        deleted,
+        org,
+        industry,
+    ) in users:
+        user_count += 1
         new_sheet.append(
             (
-                user.uuid,  # Use UUID instead of old MongoDB id
-                user.title or "",
-                user.first_name or "",
-                user.last_name or "",
-                user.email or "",
-                user.created_at.strftime(
-                    "%m/%d/%Y %H:%M:%S"
-                ),  # registered -> created_at
-                user.verified,
-                deleted_date,
-                user.org or user.industry or "Non-Affiliated",
+                uuid,  # Use UUID instead of old MongoDB id
+                title or "",
+                first_name or "",
+                last_name or "",
+                email or "",
+                created_at.strftime("%m/%d/%Y %H:%M:%S"),  # registered -> created_at
+                verified,
+                deleted.strftime("%m/%d/%Y %H:%M:%S") if deleted else None,
+                org or industry or "Non-Affiliated",
             )
         )
 
+    if output is not None:
+        new_workbook.save(output)
+        logger.info(f"Exported {user_count} users to stream")
+        return output
+
     new_workbook.save(new_workbook_path)
-    logger.info(f"Exported {len(users)} users to {new_workbook_path}")
+    logger.info(f"Exported {user_count} users to {new_workbook_path}")
     return new_workbook_path
 
 
-def populate_history(filename: str = None):
-    """Export task history to Excel file using SQLAlchemy"""
+def populate_history(filename: str = None, output: BinaryIO = None):
+    """Export task history to Excel file using SQLAlchemy\n
+    When `output` (a binary file-like) is given the workbook is written to it
+    instead of disk and `output` is returned.
+    """
     from app.models.task import Task
     from app.models.user import User
+    from app.models.language import Language
 
     new_filename = (
         os.path.join(
@@ -558,32 +794,71 @@ def populate_history(filename: str = None):
         else filename
     )
 
-    # Create Excel file
-    new_workbook_path = create_history_excel_template(new_filename)
-    new_workbook = load_workbook(new_workbook_path)
-    new_sheet = new_workbook.active
-
-    # Query all tasks with user information
-    tasks = Task.query.join(User).order_by(Task.task_id).all()
+    # Create Excel file - write-only mode streams rows instead of keeping every cell
+    new_workbook, new_workbook_path = create_history_excel_template(new_filename)
+    new_sheet = new_workbook.worksheets[0]
+
+    # Query all tasks with user and language information, streamed in batches.
+    # Only the exported columns are selected so no ORM objects or lazy loads are involved.
+    tasks = (
+        db.session.query(
+            Task.user_id,
+            User.uuid,
+            Task.task_id,
+            Task.download_date,
+            Task.created_at,
+            Task.no_of_files,
+            Task.lang,
+            Language.display_name,
+            Task.size,
+            Task.words,
+            Task.task_status,
+            Task.deleted,
+        )
+        .join(User, Task.user_id == User.id)
+        .outerjoin(Language, Task.lang_id == Language.id)
+        .order_by(Task.task_id)
+        .yield_per(1000)
+    )
 
-    for task in tasks:
+    task_count = 0
+    for (
+        user_id,
+        user_uuid,
+        task_id,
+        download_date,
+        created_at,
+        no_of_files,
+        lang,
+        language_name,
+        size,
+        words,
+        task_status,
+        deleted,
+    ) in tasks:
+        task_count += 1
         new_sheet.append(
             (
-                task.user_id,
-                f"{task.owner.uuid}_{task.task_id}",
-                task.task_id,
-                task.download_date or task.created_at.strftime("%Y/%m/%d"),
-                int((task.no_of_files or 0) / 2) or "",
-                task.lang or (task.language.display_name if task.language else ""),
-                task.size or 0,
-                task.words or 0,
-                task.task_status.value if task.task_status else "",
-                task.deleted or "",
+                user_id,
+                f"{user_uuid}_{task_id}",
+                task_id,
+                download_date or created_at.strftime("%Y/%m/%d"),
+                int((no_of_files or 0) / 2) or "",
+                lang or language_name or "",
+                size or 0,
+                words or 0,
+                task_status.value if task_status else "",
+                deleted or "",
             )
         )
 
+    if output is not None:
+        new_workbook.save(output)
+        logger.info(f"Exported {task_count} tasks to stream")
+        return output
+
     new_workbook.save(new_workbook_path)
-    logger.info(f"Exported {len(tasks)} tasks to {new_workbook_path}")
+    logger.info(f"Exported {task_count} tasks to {new_workbook_path}")
     return new_workbook_path
 
 
@@ -593,62 +868,35 @@ def populate_history(filename: str = None):
 
 
 def create_users_excel_template(filename: str = None):
-    """Create Excel template for user data export"""
+    """Create write-only Excel workbook for user data export\n
+    Returns `(workbook, file_path)`; the caller appends rows and saves.
+    """
     file_path = os.path.join(ADMIN, "users.xlsx") if not filename else filename
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Users"
-
-    column_names = [
-        "User ID",
-        "Title",
-        "First Name",
-        "Last Name",
-        "Email",
-        "Date Created",
-        "Verified",
-        "Date Deleted",
-        "Affiliation",
-    ]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title="Users")
 
     # Add column headers
-    for col_num, column_name in enumerate(column_names, start=1):
-        sheet.cell(row=1, column=col_num, value=column_name)
+    sheet.append(USERS_EXPORT_COLUMNS)
 
     # Ensure directory exists
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    workbook.save(file_path)
-    return str(file_path)
+    return workbook, str(file_path)
 
 
 def create_history_excel_template(filename: str = None):
-    """Create Excel template for task history export"""
+    """Create write-only Excel workbook for task history export\n
+    Returns `(workbook, file_path)`; the caller appends rows and saves.
+    """
     file_path = os.path.join(ADMIN, "history.xlsx") if not filename else filename
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Task History"
-
-    column_names = [
-        "user_id",
-        "upload_id",
-        "task_id",
-        "date",
-        "file_pairs",
-        "language",
-        "size",
-        "words",
-        "status",
-        "deleted",
-    ]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title="Task History")
 
     # Add column headers
-    for col_num, column_name in enumerate(column_names, start=1):
-        sheet.cell(row=1, column=col_num, value=column_name)
+    sheet.append(HISTORY_EXPORT_COLUMNS)
 
     # Ensure directory exists
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    workbook.save(file_path)
-    return str(file_path)
+    return workbook, str(file_path)
 
 
 # ==============================================================================
@@ -660,15 +908,22 @@ def copy_file(src: str, dst: str):
     """Copy file from source to destination, creating directories as needed"""
     if os.path.exists(src):
         os.makedirs(os.path.dirname(dst), exist_ok=True)
-        shutil.copy(src, dst)
+        # Contents only - skips the extra chmod that shutil.copy does
+        shutil.copyfile(src, dst)
+
+
+def is_audio_file(file_path: str):
+    """Returns the extension of `file_path` without its dot if it is one of the
+    configured audio extensions, otherwise False"""
+    ext = os.path.splitext(file_path)[1][1:]
+    return ext if ext in current_app.audio_extension_set else False
 
 
 def delete_folders(folder_path: str, search_str: str) -> None:
-    """Recursively delete all folders containing search string"""
-    if os.path.exists(folder_path):
-        for entry in os.scandir(folder_path):
-            if entry.is_dir():
-                if search_str in entry.path:
-                    if os.path.exists(entry.path):
-                        shutil.rmtree(entry.path)
-                delete_folders(entry.path, search_str)
+    """Delete all folders under `folder_path` whose path contains search string"""
+    for root, dirs, _ in os.walk(folder_path, topdown=True):
+        matched = [d for d in dirs if search_str in os.path.join(root, d)]
+        for d in matched:
+            shutil.rmtree(os.path.join(root, d), ignore_errors=True)
+        # Don't descend into folders that were just deleted
+        dirs[:] = [d for d in dirs if d not in matched]
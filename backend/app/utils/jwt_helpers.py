@@ -1,9 +1,16 @@
 """JWT Helper Functions"""
 
+from flask import g
 from flask_jwt_extended import get_jwt_identity
 
+_missing = object()
+
 
 def get_current_user_id():
-    """Get current user ID as integer from JWT token"""
-    user_id = int(get_jwt_identity())
-    return int(user_id) if user_id else None
+    """Get current user ID as integer from JWT token, memoized per request"""
+    user_id = getattr(g, "_jwt_user_id", _missing)
+    if user_id is _missing:
+        identity = get_jwt_identity()
+        user_id = int(identity) if identity else None
+        g._jwt_user_id = user_id
+    return user_id
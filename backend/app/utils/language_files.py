@@ -48,6 +48,7 @@ class LanguageFileManager:
         backup_path = os.path.join(self.backup_dir, backup_filename)
 
         try:
+            # copy2 keeps the original mtime, which cleanup_backups sorts on
             shutil.copy2(file_path, backup_path)
             current_app.logger.info(f"Created backup: {backup_path}")
             return backup_path
@@ -112,15 +113,28 @@ class LanguageFileManager:
         """Get information about all language files"""
         file_info = {}
 
+        # All language files live directly in the language directory, so one
+        # listing answers every existence check
+        try:
+            with os.scandir(self.language_dir) as it:
+                entries = {e.name: e for e in it}
+        except OSError:
+            entries = {}
+
         for file_type in self.REQUIRED_FILES:
             file_path = self.language.get_file_path(file_type)
-            exists = os.path.exists(file_path) if file_path else False
+            entry = entries.get(os.path.basename(file_path)) if file_path else None
 
-            info = {"exists": exists, "path": file_path, "size": None, "modified": None}
+            info = {
+                "exists": entry is not None,
+                "path": file_path,
+                "size": None,
+                "modified": None,
+            }
 
-            if exists:
+            if entry is not None:
                 try:
-                    stat = os.stat(file_path)
+                    stat = entry.stat()
                     info["size"] = stat.st_size
                     info["modified"] = datetime.fromtimestamp(stat.st_mtime).isoformat()
                 except Exception:
@@ -147,19 +161,25 @@ class LanguageFileManager:
         if not os.path.exists(self.backup_dir):
             return
 
+        # List the backup directory once; DirEntry caches its stat result
+        with os.scandir(self.backup_dir) as it:
+            entries = [e for e in it if not e.name.endswith(".tmp")]
+        removed = set()
+
         for file_type in self.REQUIRED_FILES:
             file_mappings = self.language.get_file_path(file_type)
             if not file_mappings:
                 continue
 
             base_name = os.path.splitext(os.path.basename(file_mappings))[0]
+            prefix = f"{base_name}_"
 
             # Find all backup files for this type
-            backup_files = []
-            for f in os.listdir(self.backup_dir):
-                if f.startswith(f"{base_name}_") and not f.endswith(".tmp"):
-                    backup_path = os.path.join(self.backup_dir, f)
-                    backup_files.append((backup_path, os.path.getmtime(backup_path)))
+            backup_files = [
+                (e.path, e.stat().st_mtime)
+                for e in entries
+                if e.name.startswith(prefix) and e.path not in removed
+            ]
 
             # Sort by modification time (newest first)
             backup_files.sort(key=lambda x: x[1], reverse=True)
@@ -168,6 +188,7 @@ class LanguageFileManager:
             for backup_path, _ in backup_files[keep_count:]:
                 try:
                     os.remove(backup_path)
+                    removed.add(backup_path)
                     current_app.logger.info(f"Cleaned up old backup: {backup_path}")
                 except Exception as e:
                     current_app.logger.error(f"Failed to cleanup backup: {e}")
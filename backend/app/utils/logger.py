@@ -1,11 +1,31 @@
 import os
+import queue
+import atexit
 import logging
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Queue shared by every QueueHandler, drained by a background listener that
+# writes records to the real handlers
+_log_queue = queue.Queue(-1)
+_queue_listener = None
+
+
+def _stop_queue_listener():
+    """Flush and stop the background log listener."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
 
 
 def setup_logging(app):
-    """Setup application logging with file rotation."""
+    """Setup application logging with file rotation.
+
+    Records are queued and written by a background thread, so logging calls
+    don't block request threads on disk I/O.
+    """
+    global _queue_listener
 
     # Get log directory from environment
     log_dir = os.getenv("LOG_DIR", "/tmp/autophon_logs")
@@ -23,10 +43,10 @@ def setup_logging(app):
 
     console_formatter = logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s")
 
-    # Setup file handler with rotation (1MB max, keep 10 files)
+    # Setup file handler with rotation (10MB max, keep 10 files)
     file_handler = RotatingFileHandler(
         filename=os.path.join(log_dir, "run.log"),
-        maxBytes=1024 * 1024,  # 1MB
+        maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=10,
         encoding="utf-8",
     )
@@ -36,7 +56,7 @@ def setup_logging(app):
     # Setup error file handler for errors only
     error_file_handler = RotatingFileHandler(
         filename=os.path.join(log_dir, "error.log"),
-        maxBytes=1024 * 1024,  # 1MB
+        maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=5,
         encoding="utf-8",
     )
@@ -50,10 +70,25 @@ def setup_logging(app):
         logging.INFO if app.config.get("DEBUG", False) else logging.WARNING
     )
 
-    # Configure root logger
-    logging.basicConfig(
-        level=log_level, handlers=[file_handler, error_file_handler, console_handler]
+    # Route all records through a queue drained by a listener thread
+    if _queue_listener is not None:
+        _queue_listener.stop()
+    else:
+        atexit.register(_stop_queue_listener)
+    queue_handler = QueueHandler(_log_queue)
+    # Leave the layout to the real handlers' formatters
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    _queue_listener = QueueListener(
+        _log_queue,
+        file_handler,
+        error_file_handler,
+        console_handler,
+        respect_handler_level=True,
     )
+    _queue_listener.start()
+
+    # Configure root logger
+    logging.basicConfig(level=log_level, handlers=[queue_handler])
 
     # Configure Flask app logger
     app.logger.setLevel(log_level)
@@ -62,9 +97,7 @@ def setup_logging(app):
     app.logger.handlers.clear()
 
     # Add our handlers to Flask app logger
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(error_file_handler)
-    app.logger.addHandler(console_handler)
+    app.logger.addHandler(queue_handler)
 
     # Log startup message
     app.logger.info(f"Logging initialized - Log directory: {log_dir}")
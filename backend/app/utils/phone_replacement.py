@@ -1,15 +1,62 @@
+import json
 import os.path
+import logging
 import argparse
 import textgrids
-import pandas as pd
+from textgrids.templates import long_header, long_tier, long_point, long_interval
 from pathlib import Path
 from dotenv import load_dotenv
-from collections import OrderedDict
+from functools import lru_cache
+from collections import defaultdict
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 
 load_dotenv()
 
 ADMIN = os.getenv("ADMIN")
 
+# Word/phone boundaries match when they agree to the millisecond
+ALIGN_TOLERANCE = 0.0005
+END_TOLERANCE = 0.0001
+
+logger = logging.getLogger(__name__)
+
+
+class NumberedTextGrid(textgrids.TextGrid):
+    """TextGrid whose long text format numbers tiers 1..N\n
+    textgrids writes every tier as `item [1]:`, so the long format is
+    produced here with the right numbering and can be streamed to a file.
+    """
+
+    def iter_long(self):
+        """Yield the long text format in pieces"""
+        yield long_header.format(self.xmin, self.xmax, len(self))
+        for tier_count, (name, tier) in enumerate(self.items(), 1):
+            if tier.is_point_tier:
+                tier_type = "PointTier"
+                elem_type = "points"
+            else:
+                tier_type = "IntervalTier"
+                elem_type = "intervals"
+            yield long_tier.format(
+                tier_count, tier_type, name, self.xmin, self.xmax, elem_type, len(tier)
+            )
+            if tier.is_point_tier:
+                for elem_count, elem in enumerate(tier, 1):
+                    yield long_point.format(elem_count, elem.xpos, elem.text)
+            else:
+                for elem_count, elem in enumerate(tier, 1):
+                    yield long_interval.format(
+                        elem_count, elem.xmin, elem.xmax, elem.text
+                    )
+
+    def _format_long(self):
+        return "".join(self.iter_long())
+
+    def write_long(self, outfile):
+        """Write the long text format to an open text file"""
+        outfile.writelines(self.iter_long())
+
 
 def run_replacement(
     input: str,
@@ -26,157 +73,79 @@ def run_replacement(
 
     words_data = None
     phones_data = None
-    phones_data_for_mod = None
-    phones_with_xmin_as_key = OrderedDict()
 
     words_grid_string = None
     phones_grid_string = None
 
     # Try to open the file as textgrid
     try:
-        print(inName)
-        grid = textgrids.TextGrid(inName)
+        logger.debug("Opening %s", inName)
+        grid = NumberedTextGrid(inName)
     # Discard and try the next one
     except Exception as ex:
-        print("Error happened when trying to create the grid ", inName, ex)
+        logger.error("Error happened when trying to create the grid %s: %s", inName, ex)
         return
 
-    mapping_data = (
-        pd.read_csv(mapping_file, sep="\t") if os.path.exists(mapping_file) else None
-    )
-
     mapping_file = f"{ADMIN}/{lang}/{lang}_complex2simple.json"
-    print(f"Mapping file: {mapping_file}")
-
-    mapping_data = pd.read_json(mapping_file)
-
-    old_phones = mod_phone_column
-    new_phones = orig_phone_column
-
-    unique_old_phones_indexes = pd.unique(mapping_data[old_phones].to_list())
+    logger.debug("Mapping file: %s", mapping_file)
 
-    mapping_data = mapping_data.set_index(old_phones)
-
-    new_phones_data = mapping_data[[new_phones]]
-
-    phones_map_dict = {}
-    for ind in unique_old_phones_indexes:
-        if type(new_phones_data.loc[ind, new_phones]) == str:
-            phones_map_dict[ind] = new_phones_data.loc[ind, new_phones]
-        else:
-            phones_map_dict[ind] = new_phones_data.loc[ind, new_phones].values.tolist()
+    phones_map_dict = _load_phones_map(
+        mapping_file,
+        mod_phone_column,
+        orig_phone_column,
+        os.path.getmtime(mapping_file),
+    )
 
     for key in grid.keys():
-        print(key)
+        logger.debug("Tier: %s", key)
         if key.split("-"):
             if "word" in key.split("-")[-1].strip():
-                print("word in key")
+                logger.debug("word in key")
                 words_data = grid[key]
                 words_grid_string = key
             elif "phone" in key.split("-")[-1].strip():
-                print("phone in key")
+                logger.debug("phone in key")
                 phones_data = grid[key]
                 phones_grid_string = key
         else:
             if "word" in key:
-                print("word in key")
+                logger.debug("word in key")
                 words_data = grid[key]
                 words_grid_string = key
             elif "phone" in key:
-                print("phone in key")
+                logger.debug("phone in key")
                 phones_data = grid[key]
                 phones_grid_string = key
 
     assert words_data != None
     assert phones_data is not None
 
-    phones_data_for_mod = phones_data.copy()
+    # the original dictionary mapping of words to phones
+    orig_dict = _load_orig_dict(new_dict, os.path.getmtime(new_dict))
 
-    for syll in grid[phones_grid_string]:
-        # Convert Praat to Unicode in the label
-        label = syll.text.transcode()
-        # Print label and syllable duration, CSV-like
-        #     print('"{}";{}'.format(label, syll.xmin))
-        phones_with_xmin_as_key[syll.xmin] = syll
-
-    with open(new_dict, "r", encoding="utf-8") as orig_file:
-        orig_data = orig_file.read().splitlines()
-
-        # mod_data = mod_file.read().splitlines()
-
-    orig_data_len = len(orig_data)
-    # mod_data_len =  len(mod_data)
-
-    done = False
-    orig_dict = {}  # the original dictionary mapping of words to phones
-    mod_dict = {}  # the modified dictionary
-
-    for data in orig_data:
-        line = data.split("\t")
-        lower_word = line[0].lower()
-
-        if lower_word not in orig_dict:
-            orig_dict[lower_word] = []
-        if len(line) < 2:
-            print(line)
-        orig_dict[lower_word].append(line[1].split())
-
-    # for data in mod_data:
-    #     line = data.split('\t')
-    #     lower_word = line[0].lower()
-
-    #     if lower_word not in mod_dict:
-    #         mod_dict[lower_word] = []
-    #     mod_dict[lower_word].append(line[1].split())
+    # Phone intervals in tier order, rewritten in place by position
+    phone_items = list(phones_data)
 
-    phones_iter = iter(phones_with_xmin_as_key.items())
-
-    last_phone_data = None
-    ended = False
-    phone_pos = 0
-    init_phone_pos = 0
-    count = 0
-    phones_xmin_keys = list(phones_with_xmin_as_key.keys())
+    # Words to realign; <unk> is spn so no need changing it.
+    words = []
     for syll in grid[words_grid_string]:
         # Convert Praat to Unicode in the label
         label = syll.text.transcode()
-
-        if label == "":
+        if label == "" or label == "<unk>":
             continue
-        if label == "<unk>":  # <unk> is spn so no need changing it.
-            continue
-        word_xmin = syll.xmin
-        word_xmax = syll.xmax
-
-        phone_data = []
-        phone_data_keys = []
-
-        ended = False
-        while not ended:
-            xmin_key = phones_xmin_keys[phone_pos]
-            dat = phones_with_xmin_as_key[xmin_key]
-            phone_xmax = dat.xmax
-
-            if round(word_xmin, 3) <= round(dat.xmin, 3) and round(
-                word_xmax, 3
-            ) >= round(phone_xmax, 3):
-                # if word_xmin <= dat.xmin and word_xmax >= phone_xmax:
-                phone_data.append(dat.text)
-                phone_data_keys.append(phones_xmin_keys[phone_pos])
-                if compare_floats(word_xmax, phone_xmax):
-                    # if word_xmax == phone_xmax:
-                    ended = True
-                    break
+        words.append((label, syll.xmin, syll.xmax))
 
-            elif word_xmin > dat.xmin and word_xmax < phone_xmax:
-                print(
-                    "Something is logically wrong here... Or the textgrid is wrong.",
-                    word_xmin,
-                    dat.xmin,
-                    phone_pos,
-                )
+    word_phones = align_words_to_phones(
+        [word[1] for word in words],
+        [word[2] for word in words],
+        [phone.xmin for phone in phone_items],
+        [phone.xmax for phone in phone_items],
+    )
 
-            phone_pos += 1
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for (label, word_xmin, word_xmax), phone_data_keys in zip(words, word_phones):
+        # phone_data_keys are indexes into phone_items
+        phone_data = [phone_items[i].text for i in phone_data_keys]
 
         possible_phones = (
             orig_dict[label.lower()] if ngin in ["FAVE", "FASE"] else orig_dict[label]
@@ -191,76 +160,157 @@ def run_replacement(
         if len(indexes) > 1:
             #         print("Possible issues here. A word has equal number of phones.")
             possible_phones_interest = [possible_phones[ind] for ind in indexes]
-            print("possible_phones_interest: ", possible_phones_interest)
-            remove_indexes = []
-            one_or_less_remains = False
-            print(possible_phones_interest, "phone_data: ", phone_data)
+            # removed[k] is set once candidate k disagrees with the textgrid phones
+            removed = bytearray(len(indexes))
+            removed_count = 0
+            max_removed = len(indexes) - 1
+            if debug:
+                logger.debug(
+                    "possible_phones_interest: %s phone_data: %s",
+                    possible_phones_interest,
+                    phone_data,
+                )
             for j in range(num_phones):
-                base_phone = phone_data[j]
+                mapped = phones_map_dict[phone_data[j]]
+                single = isinstance(mapped, str)
 
                 for k in range(len(possible_phones_interest)):
-                    if type(phones_map_dict[base_phone]) == str:
-                        if (
-                            not possible_phones_interest[k][j]
-                            == phones_map_dict[base_phone]
-                        ):
-                            remove_indexes.append(k)
-                            if len(remove_indexes) >= len(indexes) - 1:
-                                one_or_less_remains = True
-                                break
-                    else:
-                        if (
-                            not possible_phones_interest[k][j]
-                            in phones_map_dict[base_phone]
-                        ):
-                            remove_indexes.append(k)
-                            if len(remove_indexes) >= len(indexes) - 1:
-                                one_or_less_remains = True
-                                break
-                if one_or_less_remains:
+                    if removed[k]:
+                        continue
+                    candidate = possible_phones_interest[k][j]
+                    if candidate == mapped if single else candidate in mapped:
+                        continue
+                    removed[k] = 1
+                    removed_count += 1
+                    if removed_count >= max_removed:
+                        break
+                if removed_count >= max_removed:
                     break
-            tmp = []
-            for ind in indexes:
-                if ind not in remove_indexes:
-                    tmp.append(ind)
-            indexes = tmp.copy()
-
-            print(label, remove_indexes, indexes)
+            indexes = [ind for ind, r in zip(indexes, removed) if not r]
+
+            if debug:
+                logger.debug(
+                    "%s %s %s",
+                    label,
+                    [k for k, r in enumerate(removed) if r],
+                    indexes,
+                )
 
         elif len(indexes) == 0:
-            print(
-                "Possible issues here. Cannot find equal length phone list from the textgrid and the original dictionry."
+            logger.warning(
+                "Possible issues here. Cannot find equal length phone list from the textgrid and the original dictionry: %s",
+                label,
             )
 
         try:
             assert len(possible_phones[indexes[0]]) == len(phone_data_keys)
         except IndexError as e:
-            print(label, len(phone_data_keys), word_xmin)
+            logger.error("%s %s %s", label, len(phone_data_keys), word_xmin)
             raise
 
-        for i in range(len(possible_phones[indexes[0]])):
-            possible_phones_list = possible_phones[indexes[0]]
-            phones_with_xmin_as_key[phone_data_keys[i]].text = (
-                textgrids.transcript.Transcript(possible_phones_list[i])
+        possible_phones_list = possible_phones[indexes[0]]
+        for i in range(len(possible_phones_list)):
+            phone_items[phone_data_keys[i]].text = textgrids.transcript.Transcript(
+                possible_phones_list[i]
             )
 
-    phones_mod_values = list(phones_with_xmin_as_key.values())
-    phones_mod_tier = textgrids.Tier(phones_mod_values)
-    grid[phones_grid_string] = phones_mod_tier
+    grid[phones_grid_string] = textgrids.Tier(phone_items)
 
     # outName = f'output/{filename}'
-    # This has not yet been testted if it works with all textgrids
-    # It is merely to solve a bug associated with textgrids library where
-    # items are not listed consecutively. Instead, they are all having number 1.
-    grid_str = grid.format()
-    text_data = replace_numbers(grid_str)
-
-    with open(outName, "w") as outfile:
-        outfile.write(text_data)
+    with open(outName, "w", buffering=1 << 20) as outfile:
+        grid.write_long(outfile)
 
     # grid.write(outName, fmt=textgrids.TEXT_LONG)
 
 
+def align_words_to_phones(w_xmin: list, w_xmax: list, p_xmin: list, p_xmax: list):
+    """Return, for each word interval, the indexes of the phone intervals inside it\n
+    `p_xmin` must be sorted, as it is in a tier. Each word binary-searches its
+    candidate phone range, so words need not be monotonic relative to phones.
+    """
+    align_tol = ALIGN_TOLERANCE
+    end_tol = END_TOLERANCE
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    result = []
+    for word_xmin, word_xmax in zip(w_xmin, w_xmax):
+        # Only phones starting within the word (to millisecond precision)
+        start = bisect_left(p_xmin, word_xmin - align_tol)
+        end = bisect_right(p_xmin, word_xmax + align_tol)
+
+        indexes = []
+        for pi in range(start, end):
+            phone_xmax = p_xmax[pi]
+            if phone_xmax - word_xmax <= align_tol:
+                indexes.append(pi)
+                if abs(word_xmax - phone_xmax) < end_tol:
+                    break
+            elif debug and word_xmin > p_xmin[pi]:
+                logger.debug(
+                    "Something is logically wrong here... Or the textgrid is wrong. "
+                    "%s %s %s",
+                    word_xmin,
+                    p_xmin[pi],
+                    pi,
+                )
+        result.append(indexes)
+    return result
+
+
+@lru_cache(maxsize=8)
+def _load_phones_map(mapping_file: str, old_phones: str, new_phones: str, mtime: float):
+    """Load the phone mapping JSON, cached on path and modification time\n
+    Maps each old phone to its new phone, or to a frozenset when there are several.
+    """
+    with open(mapping_file, "rb") as f:
+        mapping_data = json.load(f)
+
+    if isinstance(mapping_data, list):
+        # records: [{"simple": ..., "complex": ...}, ...]
+        pairs = ((rec.get(old_phones), rec.get(new_phones)) for rec in mapping_data)
+    else:
+        # columns: {"simple": {"0": ...}, "complex": {"0": ...}} or lists
+        old_column = mapping_data[old_phones]
+        new_column = mapping_data[new_phones]
+        if isinstance(old_column, dict):
+            pairs = ((old_column[i], new_column.get(i)) for i in old_column)
+        else:
+            pairs = zip(old_column, new_column)
+
+    grouped = {}
+    for old_phone, new_phone in pairs:
+        if old_phone is not None:
+            grouped.setdefault(old_phone, []).append(new_phone)
+    return {
+        phone: (values[0] if len(values) == 1 else frozenset(values))
+        for phone, values in grouped.items()
+    }
+
+
+@lru_cache(maxsize=8)
+def _load_orig_dict(new_dict: str, mtime: float):
+    """Parse a tab separated dictionary into lowercased word -> list of
+    pronunciations, cached on path and modification time
+    """
+    with open(new_dict, "r", encoding="utf-8") as orig_file:
+        orig_data = orig_file.read().splitlines()
+
+    orig_dict = defaultdict(list)
+    for data in orig_data:
+        # Only the word and its first pronunciation field are used
+        line = data.split("\t", 2)
+        if len(line) < 2:
+            logger.warning("Malformed dictionary line: %s", line)
+        orig_dict[line[0].lower()].append(line[1].split())
+    # Plain dict so unknown words still raise KeyError
+    return dict(orig_dict)
+
+
+def _replacement_worker(job: tuple):
+    """Run `run_replacement` for one TextGrid in a worker process"""
+    return run_replacement(*job)
+
+
 def parse_args():
     """
     Parse input arguments
@@ -343,38 +393,8 @@ def check_batch(file_string):
             return False
 
 
-def replace_numbers(string):
-    count = 1
-    old_substring = "item [1]:"
-    indexes = find_all_occurrences(string, old_substring)
-    for i in range(len(indexes)):
-        index = indexes[i]
-        if index != -1:
-            string = (
-                string[:index] + f"item [{i+1}]:" + string[index + len(old_substring) :]
-            )
-            count += 1
-    return string
-
-
-def find_all_occurrences(string, substring):
-    occurrences = []
-    start = 0
-    while True:
-        index = string.find(substring, start)
-        if index == -1:
-            break
-        occurrences.append(index)
-        start = index + len(substring)
-    return occurrences
-
-
-def compare_floats(a, b, tolerance=0.0001):
-    print(f"comparing {a} with {b}")
-    return abs(a - b) < tolerance
-
-
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     # q = Queue()
     input_filename = "textgrids"
     output_filename = f"output"
@@ -385,7 +405,7 @@ if __name__ == "__main__":
 
     for path in Path(".").rglob("*.dict"):
         if "dict.dict" in str(path.name):
-            print("present")
+            logger.debug("present")
             new_dict = str(path.absolute())
 
     args = parse_args()
@@ -406,19 +426,27 @@ if __name__ == "__main__":
         )
 
     else:
+        jobs = []
         for file_name in os.listdir(args.input_filename):
             # construct full file path
             input_textgrid = os.path.join(args.input_filename, file_name)
             output_textgrid = os.path.join(args.output_filename, file_name)
 
             if ".TextGrid" in input_textgrid:
-                run_replacement(
-                    input_textgrid,
-                    output_textgrid,
-                    args.lang,
-                    args.new_dict,
-                    args.mapping_filename,
-                    args.orig_phone_column,
-                    args.mod_phone_column,
-                    args.ngin,
+                jobs.append(
+                    (
+                        input_textgrid,
+                        output_textgrid,
+                        args.lang,
+                        args.new_dict,
+                        args.mapping_filename,
+                        args.orig_phone_column,
+                        args.mod_phone_column,
+                        args.ngin,
+                    )
                 )
+
+        # Files are independent; each worker keeps its own parse caches
+        # across the files it is given. Any failure is re-raised here.
+        with ProcessPoolExecutor() as executor:
+            list(executor.map(_replacement_worker, jobs, chunksize=4))
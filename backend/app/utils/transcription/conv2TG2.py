@@ -5,6 +5,7 @@ from flask import current_app
 # local imports
 from .conv2functions import *
 from app.utils.logger import get_logger
+from app.utils.helpers import is_audio_file
 
 logger = get_logger(__name__)
 
@@ -24,60 +25,74 @@ def log_message(message, log_file):
         file.write(message + "\n")
 
 
-def is_audio_file(file_path):
-    for ext in current_app.audio_extensions:
-        if file_path.endswith(ext):
-            return ext
-    return False
+IGNORED_EXTENSIONS = frozenset((".pfsx", ".001"))
+
+
+def scan_files(folder):
+    """Yield a DirEntry for every file under `folder`, in os.walk order"""
+    subdirs = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry
+    for subdir in subdirs:
+        yield from scan_files(subdir)
 
 
 def get_all_audio_files(input_folder):
     audio_files = {}
-    for root, _, files in os.walk(input_folder):
-        for file in files:
-            if is_audio_file(os.path.join(root, file)) and not file.startswith("~$"):
-                audio_root_name = os.path.splitext(file)[0]
-                audio_files[audio_root_name] = os.path.join(root, file)
+    for entry in scan_files(input_folder):
+        if not entry.name.startswith("~$") and is_audio_file(entry.name):
+            audio_root_name = os.path.splitext(entry.name)[0]
+            audio_files[audio_root_name] = entry.path
     return audio_files
 
 
 def copy_audio_files(output_folder, audio_files):
+    os.makedirs(output_folder, exist_ok=True)
     for root_name, file_path in audio_files.items():
         file_name = os.path.basename(file_path)
         output_audio_file_path = os.path.join(output_folder, file_name)
-        os.makedirs(output_folder, exist_ok=True)
-        shutil.copy(file_path, output_audio_file_path)
+        # Contents only; a hard link would let later in-place rewrites of
+        # either path change both
+        shutil.copyfile(file_path, output_audio_file_path)
         logger.info(f"Audio file copied: {file_name}")
 
 
-def file_check(filename: str):
+def file_check(filename: str, ext: str = None):
     if filename.startswith("~$"):
         logger.info(f"IGNORING: {filename}")
         return False
-    if ".pfsx" in os.path.splitext(filename):
-        logger.info(f"IGNORING: {filename}")
-        return False
-    if ".001" in os.path.splitext(filename):
+    if ext is None:
+        ext = os.path.splitext(filename)[1]
+    if ext.lower() in IGNORED_EXTENSIONS:
         logger.info(f"IGNORING: {filename}")
         return False
     return filename
 
 
 def conv2TG2(input_folder, output_folder, log_file):
-    # Check the input folder and identify file extensions
+    # Check the input folder once, identifying file extensions and audio files
+    audio_exts = current_app.audio_extension_set
     file_names = {}
-    for root, _, files in os.walk(input_folder):
-        for file_ in files:
-            if file_check(file_):
-                name, ext = os.path.splitext(os.path.join(root, file_))
-                if name in file_names and ext not in file_names[name]:
-                    file_names[name].append(ext)
-                    log_message(
-                        f"Warning: Multiple extensions found for {os.path.basename(name)}",
-                        log_file,
-                    )
-                else:
-                    file_names[name] = [ext]
+    audio_files = {}
+    for entry in scan_files(input_folder):
+        # Split the extension once per file and reuse it for every check
+        stem, ext = os.path.splitext(entry.name)
+        if file_check(entry.name, ext):
+            name = os.path.join(os.path.dirname(entry.path), stem)
+            if ext[1:] in audio_exts:
+                audio_files[stem] = entry.path
+            if name in file_names and ext not in file_names[name]:
+                file_names[name].append(ext)
+                log_message(
+                    f"Warning: Multiple extensions found for {os.path.basename(name)}",
+                    log_file,
+                )
+            else:
+                file_names[name] = [ext]
 
     for filepath, exts in file_names.items():
         for ext in exts:
@@ -109,5 +124,4 @@ def conv2TG2(input_folder, output_folder, log_file):
                 )
                 shutil.copy(input_path, tg_path)
 
-    audio_files = get_all_audio_files(input_folder)
     copy_audio_files(output_folder, audio_files)
@@ -2,11 +2,11 @@ import os
 import csv
 import pympi
 import pandas as pd
-from pandas import DataFrame
 from praatio import textgrid
 
 # local imports
 from app.utils.logger import get_logger
+from app.utils.helpers import replace_decomposed
 
 logger = get_logger(__name__)
 
@@ -15,9 +15,10 @@ def convert_eaf_to_tsv(input_path, output_path):
     # Read the EAF file
     eaf = pympi.Elan.Eaf(file_path=input_path)
     # Open the output file for writing
-    with open(output_path, "w") as output_file:
+    with open(output_path, "w", buffering=1 << 20) as output_file:
         # Iterate through tiers in the EAF file
         for tier_name in eaf.get_tier_names():
+            rows = []
             # Iterate through annotations in the tier
             for annotation in eaf.get_annotation_data_for_tier(tier_name):
                 # Get the start and end times and the transcription for the annotation
@@ -31,42 +32,55 @@ def convert_eaf_to_tsv(input_path, output_path):
                     continue
 
                 # Convert the times from milliseconds to seconds
-                start_time /= 1000
-                end_time /= 1000
-
-                # Write the data to the output file
-                output_file.write(
-                    f"{tier_name}\t{start_time}\t{end_time}\t{transcription}\n"
+                rows.append(
+                    f"{tier_name}\t{start_time / 1000}\t{end_time / 1000}\t{transcription}\n"
                 )
 
+            # Write the tier's rows to the output file in one batch
+            output_file.writelines(rows)
+
     logger.info(f"Converted {input_path} to {output_path}")
 
 
-def validate_tsv_file(df: DataFrame, file):
+def validate_tsv_rows(rows: list, file):
     # Check the number of columns
-    if df.shape[1] < 3:
+    if len(rows[0]) < 3:
         raise Exception(
             f"{os.path.basename(file)}: should have at least three columns with content."
         )
 
-    # Check data types of columns 2 and 3 again (starting from row 2)
-    if not pd.api.types.is_numeric_dtype(
-        pd.to_numeric(df.iloc[1:, 1], errors="coerce").dropna()
-    ) or not pd.api.types.is_numeric_dtype(
-        pd.to_numeric(df.iloc[1:, 2], errors="coerce").dropna()
-    ):
-        raise Exception(
-            f"{os.path.basename(file)}: Columns 2 and 3 should contain numerical values."
-        )
-
-    # Check if end_time is greater than start_time
-    numeric_end_time = pd.to_numeric(df.iloc[:, 2], errors="coerce")
-    numeric_start_time = pd.to_numeric(df.iloc[:, 1], errors="coerce")
-    if (numeric_end_time <= numeric_start_time).any():
-        raise Exception(
-            f"{os.path.basename(file)}: end_time (column 3) should be greater than start_time (column 2)."
-        )
-    return df
+    # Check if end_time is greater than start_time, ignoring non-numeric rows
+    for row in rows:
+        try:
+            start_time = float(row[1])
+            end_time = float(row[2])
+        except ValueError:
+            continue
+        if end_time <= start_time:
+            raise Exception(
+                f"{os.path.basename(file)}: end_time (column 3) should be greater than start_time (column 2)."
+            )
+    return rows
+
+
+def format_tsv_row(row) -> str:
+    """Format a 3, 4 or 5+ column row as a `tier, start, end, text` TSV line"""
+    if len(row) < 4:
+        tier_name = "transcription"
+        start_time = row[0]
+        end_time = row[1]
+        transcription = row[2]
+    elif len(row) > 4:
+        tier_name = row[1]
+        start_time = row[2]
+        end_time = row[3]
+        transcription = row[4]
+    else:
+        tier_name = row[0]
+        start_time = row[1]
+        end_time = row[2]
+        transcription = row[3]
+    return f"{tier_name}\t{start_time}\t{end_time}\t{transcription}\n"
 
 
 def convert_tsv_to_tsv(tsv_file, output_tsv_file):
@@ -74,29 +88,45 @@ def convert_tsv_to_tsv(tsv_file, output_tsv_file):
         with open(tsv_file, "r", encoding="utf-8") as file:
             # Read lines and strip trailing white spaces or tabs
             lines = [line.strip() for line in file]
+        # Keep the stripped lines in the input too; a .txt input is also the
+        # intermediate file conv2TG2 builds its TextGrid from
         with open(tsv_file, "w", encoding="utf-8") as file:
             file.write("\n".join(lines))
 
-        # Read the TSV file into a DataFrame
-        df = pd.read_csv(tsv_file, sep="\t", header=None)
+        # Parse rows as raw strings, skipping blank lines
+        rows = [row for row in csv.reader(lines, delimiter="\t") if row]
+        if not rows:
+            raise ValueError("No columns to parse from file")
+
+        # Rows are padded to the width of the first row; wider rows are an error
+        n_cols = len(rows[0])
+        for line_no, row in enumerate(rows, 1):
+            if len(row) > n_cols:
+                raise csv.Error(
+                    f"Expected {n_cols} fields in line {line_no}, saw {len(row)}"
+                )
+            if len(row) < n_cols:
+                row.extend([""] * (n_cols - len(row)))
+
+        # Strip quotes from columns that are consistently quoted; each column
+        # scan stops at the first value that is not quoted
+        quoted_cols = [
+            col
+            for col in range(n_cols)
+            if all(
+                len(row[col]) > 1 and row[col][0] == '"' and row[col][-1] == '"'
+                for row in rows
+            )
+        ]
+        if quoted_cols:
+            for row in rows:
+                for col in quoted_cols:
+                    row[col] = row[col].strip('"')
 
         # Validate the TSV file
-        validate_tsv_file(df, tsv_file)
-
-        # Check if content is consistently surrounded by quotes in each column
-        for col in df.columns:
-            if (
-                df[col]
-                .apply(
-                    lambda x: isinstance(x, str)
-                    and x.startswith('"')
-                    and x.endswith('"')
-                )
-                .all()
-            ):
-                df[col] = df[col].str.strip('"')
+        validate_tsv_rows(rows, tsv_file)
 
-    except pd.errors.ParserError as e:
+    except csv.Error as e:
         logger.info(f"Skipped {tsv_file}: Error parsing TSV file - {e}")
         return
     except ValueError as e:
@@ -105,28 +135,7 @@ def convert_tsv_to_tsv(tsv_file, output_tsv_file):
 
     # Open the output TSV file for writing
     with open(output_tsv_file, "w") as output_file:
-        # Iterate through rows in the DataFrame
-        for _, row in df.iterrows():
-            if len(row) < 4:
-                tier_name = "transcription"
-                start_time = row[0]
-                end_time = row[1]
-                transcription = row[2]
-            elif len(row) > 4:
-                tier_name = row[1]
-                start_time = row[2]
-                end_time = row[3]
-                transcription = row[4]
-            else:
-                tier_name = row[0]
-                start_time = row[1]
-                end_time = row[2]
-                transcription = row[3]
-
-            # Write the data to the output TSV file
-            output_file.write(
-                f"{tier_name}\t{start_time}\t{end_time}\t{transcription}\n"
-            )
+        output_file.writelines(format_tsv_row(row) for row in rows)
 
     logger.info(f"Converted {tsv_file} to {output_tsv_file}")
 
@@ -171,36 +180,17 @@ def convert_excel_to_tsv(excel_file, tsv_file):
 
     # Open the TSV file for writing
     with open(tsv_file, "w") as output_file:
-        # Iterate through rows in the DataFrame
-        for _, row in df.iterrows():
-            if len(row) < 4:
-                tier_name = "transcription"
-                start_time = row[0]
-                end_time = row[1]
-                transcription = row[2]
-            elif len(row) > 4:
-                tier_name = row[1]
-                start_time = row[2]
-                end_time = row[3]
-                transcription = row[4]
-            else:
-                tier_name = row[0]
-                start_time = row[1]
-                end_time = row[2]
-                transcription = row[3]
-
-            # Write the data to the TSV file
-            output_file.write(
-                f"{tier_name}\t{start_time}\t{end_time}\t{transcription}\n"
-            )
+        # Iterate through rows as plain tuples
+        output_file.writelines(
+            format_tsv_row(row) for row in df.itertuples(index=False, name=None)
+        )
 
     logger.info(f"Converted {excel_file} to {tsv_file}")
 
 
-def make_float(s):
-    if "," in str(s):
-        s = str(s).replace(",", ".")
-    return float(s)
+def make_float(s: str):
+    # csv.reader yields str already, so only swap a decimal comma when present
+    return float(s.replace(",", ".")) if "," in s else float(s)
 
 
 def detect_header(data):
@@ -213,8 +203,6 @@ def detect_header(data):
 
 
 def tsv_to_textgrid(tsv_file, textgrid_file):
-    from app.utils.helpers import replace_decomposed
-
     tiers = {}
     with open(tsv_file, "r") as tsv:
         reader = csv.reader(tsv, delimiter="\t", quoting=csv.QUOTE_NONE)
@@ -255,12 +243,9 @@ def tsv_to_textgrid(tsv_file, textgrid_file):
                     f"Error reading line in {os.path.basename(tsv_file)}: {e}"
                 )
 
-    min_time = min(
-        min(intervals, key=lambda x: x[0])[0] for intervals in tiers.values()
-    )
-    max_time = max(
-        max(intervals, key=lambda x: x[1])[1] for intervals in tiers.values()
-    )
+    # Per-tier extremes are reduced over plain float lists, then across tiers
+    min_time = min(min([start for start, _, _ in ivs]) for ivs in tiers.values())
+    max_time = max(max([end for _, end, _ in ivs]) for ivs in tiers.values())
     textgrid_obj = textgrid.Textgrid(minTimestamp=min_time, maxTimestamp=max_time)
 
     for tier_name, intervals in tiers.items():
@@ -1,13 +1,12 @@
 import os
 import shutil
 import parselmouth
-from praatio import textgrid
-from collections import defaultdict
-from tempfile import NamedTemporaryFile
-from praatio.utilities.constants import Interval
+from itertools import repeat
+from collections import Counter
 
 # local imports
 from app.utils.logger import get_logger
+from app.utils.helpers import replace_decomposed
 
 logger = get_logger(__name__)
 
@@ -44,19 +43,68 @@ def log_skipped_files(
             ),
         ]
 
+        # Build the whole report first so it goes out in a single write
+        chunks = []
         for title, files in sections:
             if files:
-                log_file.write(f"{title}:\n")
-                for file in files:
-                    log_file.write(f"- {file}\n")
-                log_file.write("\n")
+                chunks.append(f"{title}:\n")
+                chunks.extend(f"- {file}\n" for file in files)
+                chunks.append("\n")
 
-        if not any(files for _, files in sections):
-            log_file.write("No files were skipped.\n")
+        if not chunks:
+            chunks.append("No files were skipped.\n")
+        log_file.write("".join(chunks))
 
         logger.info(f"Log file created: {log_file_path}")
 
 
+# Long-form TextGrid with a single "transcription" interval spanning the
+# sound, laid out exactly as praatio's long_textgrid writer does
+_TEXTGRID_TEMPLATE = (
+    'File type = "ooTextFile"\n'
+    'Object class = "TextGrid"\n'
+    "\n"
+    "xmin = {xmin} \n"
+    "xmax = {xmax} \n"
+    "tiers? <exists> \n"
+    "size = 1 \n"
+    "item []: \n"
+    "    item [1]:\n"
+    '        class = "IntervalTier" \n'
+    '        name = "transcription" \n'
+    "        xmin = {xmin} \n"
+    "        xmax = {xmax} \n"
+    "        intervals: size = 1 \n"
+    "        intervals [1]:\n"
+    "            xmin = {xmin} \n"
+    "            xmax = {xmax} \n"
+    '            text = "{text}" \n'
+)
+
+
+def _format_time(value):
+    """Format a timestamp the way praatio does: whole numbers without decimals"""
+    if abs(value - int(value)) <= 1e-14 * max(abs(value), abs(int(value))):
+        return "%d" % value
+    return repr(value)
+
+
+def write_textgrid(path, start_time, end_time, transcription):
+    """Write a single-interval TextGrid covering `start_time` to `end_time`"""
+    if not start_time < end_time:
+        raise ValueError(
+            f"The start time ({start_time}) must be less than the end time ({end_time})"
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            _TEXTGRID_TEMPLATE.format(
+                xmin=_format_time(start_time),
+                xmax=_format_time(end_time),
+                text=transcription.replace('"', '""'),
+            )
+        )
+
+
 def get_sound_boundaries(sound):
     start_time = sound.xmin
     end_time = sound.xmax
@@ -64,128 +112,135 @@ def get_sound_boundaries(sound):
 
 
 def find_files(directory):
-    for dirpath, _, filenames in os.walk(directory):
-        for f in filenames:
-            filepath = os.path.join(dirpath, f)
-            if (
-                not f.startswith(".") and os.path.getsize(filepath) > 1
-            ):  # Skip hidden files and empty files
-                yield filepath
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Like os.walk, don't descend into symlinked directories
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                elif (
+                    not entry.name.startswith(".") and entry.stat().st_size > 1
+                ):  # Skip hidden files and empty files
+                    yield entry.path
+
+
+def _process_one(full_audio_path, lab_path, output_folder, original_dir):
+    """Write the TextGrid and copy the audio for one audio/lab pair into an
+    existing output directory\n
+    Returns `(status, full_audio_path)` where status is "ok", "incompatible"
+    or "skipped".
+    """
+    base_name = os.path.splitext(full_audio_path)[0]
+    base_name = base_name.replace(f"{original_dir}/", "")
+    audio_path = full_audio_path.replace(f"{original_dir}/", "")
+
+    try:
+        try:
+            audio = parselmouth.Sound(full_audio_path)
+        except Exception as e:
+            logger.info(f"Error loading audio file {full_audio_path}: {str(e)}")
+            return "incompatible", full_audio_path
+
+        # The boundaries come straight from the loaded sound
+        start_time, end_time = get_sound_boundaries(audio)
+        logger.info(f"START TIME: {start_time}")
+        logger.info(f"END TIME: {end_time}")
+
+        status = "ok"
+        if start_time is not None and end_time is not None:
+            with open(lab_path, "r") as text_file:
+                transcription = replace_decomposed(text_file.read().strip())
+
+            # save file
+            tg_filename = os.path.join(output_folder, f"{base_name}.TextGrid")
+            write_textgrid(tg_filename, start_time, end_time, transcription)
+
+            # Copy audio file to output folder
+            audio_filename = os.path.join(output_folder, audio_path)
+            shutil.copy(
+                full_audio_path,
+                audio_filename,
+            )
+        else:
+            logger.info(
+                f"Speech boundaries could not be detected for {full_audio_path}"
+            )
+            status = "incompatible"
 
+        return status, full_audio_path
+    except Exception as e:
+        logger.info(f"Error processing {full_audio_path}: {str(e)}")
+        return "skipped", full_audio_path
 
-def lab2TextGrid(input_folder, output_folder, log_file, original_dir=None):
-    from app.utils.helpers import replace_decomposed
 
+def lab2TextGrid(input_folder, output_folder, log_file, original_dir=None):
     # Create output folder if it does not exist
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    audio_files = list(find_files(input_folder))
-    lab_files = list(find_files(input_folder))
-
-    audio_files = [f for f in audio_files if os.path.splitext(f)[1] not in (".lab",)]
-    lab_files = [f for f in lab_files if f.endswith(".lab")]
-
-    # Check for duplicate base names
-    audio_base_names = defaultdict(list)
-    lab_base_names = defaultdict(list)
-
-    for f in audio_files:
-        base_name = os.path.splitext(f)[0]
-        audio_base_names[base_name].append(f)
-
-    for f in lab_files:
-        base_name = os.path.splitext(f)[0]
-        lab_base_names[base_name].append(f)
-
-    duplicate_audio_files = [
-        item
-        for sublist in [v for k, v in audio_base_names.items() if len(v) > 1]
-        for item in sublist
-    ]
-    duplicate_lab_files = [
-        item
-        for sublist in [v for k, v in lab_base_names.items() if len(v) > 1]
-        for item in sublist
-    ]
+    # Walk the input once, splitting each path a single time and counting
+    # base names to spot duplicates
+    audio_files, lab_files = [], []
+    audio_counts, lab_counts = Counter(), Counter()
+    for f in find_files(input_folder):
+        base_name, ext = os.path.splitext(f)
+        if ext == ".lab":
+            lab_files.append((f, base_name))
+            lab_counts[base_name] += 1
+        else:
+            audio_files.append((f, base_name))
+            audio_counts[base_name] += 1
 
-    audio_files = [
-        f for f in audio_files if len(audio_base_names[os.path.splitext(f)[0]]) == 1
-    ]
-    lab_files = [
-        f for f in lab_files if len(lab_base_names[os.path.splitext(f)[0]]) == 1
-    ]
+    duplicate_audio_files = [f for f, b in audio_files if audio_counts[b] > 1]
+    duplicate_lab_files = [f for f, b in lab_files if lab_counts[b] > 1]
 
-    lab_files_base = {os.path.splitext(f)[0]: f for f in lab_files}
+    # Keep only files whose base name is unique
+    lab_files_base = {b: f for f, b in lab_files if lab_counts[b] == 1}
 
     skipped_audio_files = []
     skipped_lab_files = []
     incompatible_audio_files = []
 
-    for full_audio_path in audio_files:
-        base_name = os.path.splitext(full_audio_path)[0]
+    # Pair every audio file with its lab file up front
+    pairs = []
+    for full_audio_path, base_name in audio_files:
+        if audio_counts[base_name] > 1:
+            continue
         lab_path = lab_files_base.pop(base_name, None)
-
-        base_name = base_name.replace(f"{original_dir}/", "")
-        audio_path = full_audio_path.replace(f"{original_dir}/", "")
-
         if lab_path:
-            try:
-                try:
-                    audio = parselmouth.Sound(full_audio_path)
-                except Exception as e:
-                    logger.info(f"Error loading audio file {full_audio_path}: {str(e)}")
-                    incompatible_audio_files.append(full_audio_path)
-                    continue
-
-                with NamedTemporaryFile(delete=False) as temp_wav:
-                    audio.save(str(temp_wav.name), "WAV")
-                    sound = parselmouth.Sound(temp_wav.name)
-
-                start_time, end_time = get_sound_boundaries(sound)
-                logger.info(f"START TIME: {start_time}")
-                logger.info(f"END TIME: {end_time}")
-
-                if start_time is not None and end_time is not None:
-                    with open(lab_path, "r") as text_file:
-                        transcription = replace_decomposed(text_file.read().strip())
-
-                    tg = textgrid.Textgrid()
-                    interval = Interval(start_time, end_time, transcription)
-                    tier = textgrid.IntervalTier(
-                        name="transcription",
-                        entries=[interval],
-                        minT=start_time,
-                        maxT=end_time,
-                    )
-                    tg.addTier(tier)
-                    # save file
-                    tg_filename = os.path.join(output_folder, f"{base_name}.TextGrid")
-                    os.makedirs(os.path.dirname(tg_filename), exist_ok=True)
-                    tg.save(
-                        fn=tg_filename, format="long_textgrid", includeBlankSpaces=True
-                    )
-
-                    # Copy audio file to output folder
-                    audio_filename = os.path.join(output_folder, audio_path)
-                    os.makedirs(os.path.dirname(audio_filename), exist_ok=True)
-                    shutil.copy(
-                        full_audio_path,
-                        audio_filename,
-                    )
-                else:
-                    logger.info(
-                        f"Speech boundaries could not be detected for {full_audio_path}"
-                    )
-                    incompatible_audio_files.append(full_audio_path)
-
-                os.remove(temp_wav.name)
-            except Exception as e:
-                logger.info(f"Error processing {full_audio_path}: {str(e)}")
-                skipped_audio_files.append(full_audio_path)
+            pairs.append((full_audio_path, lab_path))
         else:
             skipped_audio_files.append(full_audio_path)
 
+    # The TextGrid and the audio copy share a directory; create them all up
+    # front so the workers only write files
+    output_dirs = {
+        os.path.dirname(
+            os.path.join(output_folder, audio.replace(f"{original_dir}/", ""))
+        )
+        for audio, _ in pairs
+    }
+    for directory in output_dirs:
+        os.makedirs(directory, exist_ok=True)
+
+    # Pairs run in-process: this is called per upload from gunicorn workers,
+    # where a process pool would pay its startup cost on every request
+    results = map(
+        _process_one,
+        (audio for audio, _ in pairs),
+        (lab for _, lab in pairs),
+        repeat(output_folder),
+        repeat(original_dir),
+    )
+
+    for status, full_audio_path in results:
+        if status == "incompatible":
+            incompatible_audio_files.append(full_audio_path)
+        elif status == "skipped":
+            skipped_audio_files.append(full_audio_path)
+
     # Remaining lab files in lab_files_base do not have a matching audio file
     skipped_lab_files.extend(lab_files_base.values())
 
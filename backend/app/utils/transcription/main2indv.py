@@ -1,11 +1,13 @@
 import os
+import re
 import math
 import shutil
 import pandas as pd
-from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
 
 # local imports
 from app.utils.logger import get_logger
+from app.utils.helpers import is_audio_file, replace_decomposed
 
 logger = get_logger(__name__)
 
@@ -31,22 +33,34 @@ def find_transcription_file(folder_path, log_file):
     raise Exception(error_message)
 
 
+_DIGITS = r"\d(?:_?\d)*"
+# Everything float() accepts, with "," allowed as the decimal separator
+_NUMBER_RE = re.compile(
+    rf"\s*[-+]?(?:(?:{_DIGITS}(?:[.,](?:{_DIGITS})?)?|[.,]{_DIGITS})"
+    rf"(?:e[-+]?{_DIGITS})?|nan|inf(?:inity)?)\s*",
+    re.IGNORECASE,
+)
+
+
 def is_number(s):
+    return _NUMBER_RE.fullmatch(str(s)) is not None
+
+
+def read_tsv(file_path):
+    """Reads a headerless TSV with the pyarrow engine, falling back to the
+    default parser for ragged rows, which pyarrow rejects"""
     try:
-        if "," in str(s):
-            s = str(s).replace(",", ".")
-        float(s)
-        return True
-    except ValueError:
-        return False
+        return pd.read_csv(file_path, sep="\t", header=None, engine="pyarrow")
+    except pd.errors.ParserError:
+        return pd.read_csv(file_path, sep="\t", header=None)
 
 
 def read_data_file(file_path):
     # Read the file assuming no header initially
     if file_path.endswith(".xlsx"):
-        data = pd.read_excel(file_path, header=None, engine="openpyxl")
+        data = pd.read_excel(file_path, header=None, engine="calamine")
     elif file_path.endswith(".tsv") or file_path.endswith(".txt"):
-        data = pd.read_csv(file_path, sep="\t", header=None)
+        data = read_tsv(file_path)
 
     # Check if the second and third values of the first row are non-numeric
     if not is_number(data.iloc[0, 1]) and not is_number(data.iloc[0, 2]):
@@ -56,18 +70,11 @@ def read_data_file(file_path):
     return data
 
 
-def is_audio_file(file_path):
-    for ext in current_app.audio_extensions:
-        if file_path.endswith(ext):
-            return ext
-    return False
-
-
 def get_all_audio_files(input_folder):
     audio_files = {}
     for root, _, files in os.walk(input_folder):
         for file in files:
-            if is_audio_file(os.path.join(root, file)) and not file.startswith("~$"):
+            if is_audio_file(file) and not file.startswith("~$"):
                 audio_root_name = os.path.splitext(file)[0]
                 audio_files[audio_root_name] = os.path.join(root, file)
     return audio_files
@@ -88,27 +95,19 @@ def clean_list(iterable: list):
 def process_transcription_file(
     transcription_path, input_folder_path, output_folder_path, log_file
 ):
-    from app.utils.helpers import replace_decomposed
-
-    output_dict = {}
     data = read_data_file(transcription_path)
-    for index, row in data.iterrows():
-        # Removed the condition to skip the first row
-        line = clean_list(row.tolist())
-        key = line[0]
-        # remove file extension from filename
-        key = os.path.splitext(key)[0]
-        content = line
-        if key not in output_dict:
-            output_dict[key] = [content]
-        else:
-            output_dict[key].append(content)
+    # Group rows by file name with the extension removed, in first-seen order.
+    # Rows are read as plain tuples and have their empty cells dropped.
+    keys = data[0].astype(str).map(lambda name: os.path.splitext(name)[0])
+    output_dict = {
+        key: [clean_list(row) for row in rows.itertuples(index=False, name=None)]
+        for key, rows in data.groupby(keys, sort=False)
+    }
 
     transcription_keys = set(output_dict.keys())
     audio_files = get_all_audio_files(input_folder_path)
-    audio_keys = set(
-        os.path.splitext(os.path.basename(path))[0] for path in audio_files.values()
-    )
+    # get_all_audio_files already keys each path by its extensionless name
+    audio_keys = set(audio_files)
 
     missing_transcriptions = audio_keys - transcription_keys
     missing_audios = transcription_keys - audio_keys
@@ -122,21 +121,29 @@ def process_transcription_file(
             log_file.write("Transcription files without audio files:\n")
             log_file.write("\n".join(missing_audios) + "\n")
 
-    for key in output_dict:
-        with open(os.path.join(output_folder_path, key + ".txt"), "w") as f:
-            for line in output_dict[key]:
-                text = "\t".join(map(str, line)) + "\n"
-                f.write(replace_decomposed(text))
+    for key, lines in output_dict.items():
+        # Normalize each file's content once; replace_decomposed works per
+        # character cluster, so this matches normalizing line by line
+        blob = "".join("\t".join(map(str, line)) + "\n" for line in lines)
+        with open(
+            os.path.join(output_folder_path, key + ".txt"), "w", buffering=1 << 20
+        ) as f:
+            f.write(replace_decomposed(blob))
 
 
 def copy_audio_files(output_folder, audio_files):
-    for root_name, file_path in audio_files.items():
+    os.makedirs(output_folder, exist_ok=True)
+
+    def copy_one(file_path):
         file_name = os.path.basename(file_path)
-        output_audio_file_path = os.path.join(output_folder, file_name)
-        os.makedirs(output_folder, exist_ok=True)
-        shutil.copy(file_path, output_audio_file_path)
+        shutil.copy(file_path, os.path.join(output_folder, file_name))
         logger.info(f"Audio file copied: {file_name}")
 
+    # Copies are I/O bound and shutil releases the GIL, so threads overlap them
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(copy_one, audio_files.values()))
+
 
 # Main Execution
 def main(input_folder, output_folder, log_file):
@@ -1,10 +1,12 @@
 import os
 import shutil
+import numpy as np
 import pandas as pd
-from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
 
 # local imports
 from app.utils.logger import get_logger
+from app.utils.helpers import is_audio_file, replace_decomposed
 
 logger = get_logger(__name__)
 
@@ -31,62 +33,80 @@ def find_transcription_file(folder_path, log_file):
     raise Exception(error_message)
 
 
-def read_data_file(file_path):
-    if file_path.endswith(".xlsx"):
-        return pd.read_excel(file_path, header=None, engine="openpyxl")
-    elif file_path.endswith(".tsv"):
-        return pd.read_csv(file_path, sep="\t", header=None)
-    elif file_path.endswith(".txt"):
+def read_tsv(file_path):
+    """Reads a headerless TSV with the pyarrow engine, falling back to the
+    default parser for ragged rows, which pyarrow rejects"""
+    try:
+        return pd.read_csv(file_path, sep="\t", header=None, engine="pyarrow")
+    except pd.errors.ParserError:
         return pd.read_csv(file_path, sep="\t", header=None)
 
 
-def is_audio_file(file_path):
-    for ext in current_app.audio_extensions:
-        if file_path.endswith(ext):
-            return ext
-    return False
+def read_data_file(file_path):
+    if file_path.endswith(".xlsx"):
+        return pd.read_excel(file_path, header=None, engine="calamine")
+    elif file_path.endswith(".tsv") or file_path.endswith(".txt"):
+        return read_tsv(file_path)
 
 
 def get_all_audio_files(input_folder):
     audio_files = {}
     for root, _, files in os.walk(input_folder):
         for file in files:
-            if is_audio_file(os.path.join(root, file)) and not file.startswith("~$"):
+            if is_audio_file(file) and not file.startswith("~$"):
                 audio_root_name = os.path.splitext(file)[0]
                 audio_files[audio_root_name] = os.path.join(root, file)
     return audio_files
 
 
-def find_value(iterable, index: int = 0):
-    """Returns the index of the next `str` value in iterable starting from `index`"""
-    for i in range(index, len(iterable)):
-        if isinstance(iterable[i], str):
-            return i
+def string_columns(data):
+    """Returns the column positions of the first and second `str` value in
+    every row of `data`"""
+    is_str = data.map(lambda x: isinstance(x, str)).to_numpy(dtype=bool)
+    rows = np.arange(len(is_str))
 
+    audio_index = is_str.argmax(axis=1)
+    has_audio = is_str[rows, audio_index]
+    # The first string is the first True, so clearing it leaves the second
+    is_str[rows, audio_index] = False
+    trans_index = is_str.argmax(axis=1)
+    has_trans = is_str[rows, trans_index]
 
-def create_lab_files(data, input_folder, output_folder, audio_files, log_file):
-    from app.utils.helpers import replace_decomposed
+    if not (has_audio & has_trans).all():
+        raise Exception(
+            "Every row of the transcription file needs an audio file name and a transcription"
+        )
+    return audio_index, trans_index
 
-    audio_files_not_found = set(audio_files.keys())
-    audio_files_listed_but_not_found = []
 
-    for _, row in data.iterrows():
-        audio_index = find_value(row)
-        trans_index = find_value(row, audio_index + 1)
+def create_lab_files(data, input_folder, output_folder, audio_files, log_file):
+    values = data.to_numpy(dtype=object)
+    rows = np.arange(len(values))
+    audio_index, trans_index = string_columns(data)
+    audio_names = [
+        os.path.splitext(str(value))[0] for value in values[rows, audio_index]
+    ]
+
+    audio_files_not_found = set(audio_files) - set(audio_names)
+    audio_files_listed_but_not_found = []
+    lab_files = []
 
-        audio_file_name = os.path.splitext(str(row[audio_index]))[0]
-        transcription = replace_decomposed(str(row[trans_index]))
+    for audio_file_name, trans_value in zip(audio_names, values[rows, trans_index]):
+        transcription = replace_decomposed(str(trans_value))
 
         if audio_file_name in audio_files:
-            lab_filename = audio_file_name + ".lab"
             lab_filename = os.path.splitext(audio_files[audio_file_name])[0] + ".lab"
             lab_filename = lab_filename.replace(f"{input_folder}/", "")
             lab_filepath = os.path.join(output_folder, lab_filename)
-            os.makedirs(os.path.dirname(lab_filepath), exist_ok=True)
-            with open(lab_filepath, "w") as f:
-                f.write(transcription)
-            logger.info(f"Lab file created: {lab_filepath}")
-            audio_files_not_found.remove(audio_file_name)
+            lab_files.append((lab_filepath, transcription))
+
+    # Create the output directories in one pass, then write the lab files
+    for directory in {os.path.dirname(path) for path, _ in lab_files}:
+        os.makedirs(directory, exist_ok=True)
+    for lab_filepath, transcription in lab_files:
+        with open(lab_filepath, "w") as f:
+            f.write(transcription)
+        logger.info(f"Lab file created: {lab_filepath}")
 
     # Log the audio files that were not listed in the transcription document
     with open(log_file, "a") as f:
@@ -108,13 +128,25 @@ def create_lab_files(data, input_folder, output_folder, audio_files, log_file):
 
 
 def copy_audio_files(input_folder, output_folder, audio_files):
-    for root_name, file_path in audio_files.items():
+    targets = []
+    for file_path in audio_files.values():
         file_name = file_path.replace(f"{input_folder}/", "")
-        output_audio_path = os.path.join(output_folder, file_name)
-        os.makedirs(os.path.dirname(output_audio_path), exist_ok=True)
+        targets.append((file_path, file_name, os.path.join(output_folder, file_name)))
+
+    # Create every destination directory before the copies are dispatched
+    for directory in {os.path.dirname(target[2]) for target in targets}:
+        os.makedirs(directory, exist_ok=True)
+
+    def copy_one(target):
+        file_path, file_name, output_audio_path = target
         shutil.copy(file_path, output_audio_path)
         logger.info(f"Audio file copied: {file_name}")
 
+    # Copies are I/O bound and shutil releases the GIL, so threads overlap them
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(copy_one, targets))
+
 
 def main(input_folder, output_folder, log_file):
     if not os.path.exists(output_folder):
@@ -2,6 +2,7 @@ import re
 import os
 import math
 import json
+import codecs
 import shutil
 import zipfile
 import tempfile
@@ -9,11 +10,15 @@ import traceback
 import subprocess
 import charset_normalizer
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from flask import current_app
 from dotenv import load_dotenv
 from werkzeug.datastructures import FileStorage
 
 from app.utils.logger import get_logger
+from app.utils.helpers import is_audio_file
 
 load_dotenv()
 
@@ -21,69 +26,73 @@ ADMIN = os.getenv("ADMIN")
 UPLOADS = os.getenv("UPLOADS")
 MFA_GENERATE_DICTIONARY = os.getenv("MFA_GENERATE_DICTIONARY")
 
-logger = get_logger(__name__)
-
+# Transcript cleanup patterns, compiled once for the per-entry loops
+_PUNCT_TABLE = str.maketrans(
+    "", "", '.!?,"<>()*{}[]¿¡‘’‚‛“”„‟«»‹›❛❜❝❞「」『』〝〞〟﹁﹂﹃﹄'
+)
+# a colon at the start or end of a word, i.e. next to a space or the text edge
+_EDGE_COLON_RE = re.compile(r"(?:^|(?<= )):|:(?= |$)")
+_NONWORD_RE = re.compile(r"[^\w\s]")
 
-def isAudioFile(file):
-    for ext in current_app.audio_extensions:
-        if file.endswith(ext):
-            return ext
-    return False
+logger = get_logger(__name__)
 
 
 def check_phones(dictcustom, phonearr):
-    valid = True
-    dictcustom_lines = dictcustom.split("\n")
+    phoneset = (
+        phonearr if isinstance(phonearr, (set, frozenset)) else frozenset(phonearr)
+    )
     invalid_phones = set()
-    for i in range(len(dictcustom_lines)):
-        line = dictcustom_lines[i]
-        if line != "":
-            line_phones = line.split(" ")
-            word = line_phones[0]
-            phones = line_phones[1:]
-            for j in range(len(phones)):
-                phone = phones[j].strip()
-                if phone != "" and phone not in phonearr:
-                    logger.info(f"Invalid phone: {phone} in word: {word}")
-                    invalid_phones.add(phone)
-                    valid = False
+    for line in dictcustom.splitlines():
+        # the first token is the word, the rest are its phones
+        invalid_phones.update(line.split()[1:])
+    invalid_phones -= phoneset
+    if invalid_phones:
+        logger.info(f"Invalid phones: {invalid_phones}")
     return {
-        "valid": valid,
+        "valid": not invalid_phones,
         "invalid_phones": invalid_phones,
     }
 
 
+_SIZE_NAMES = ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")
+_SIZE_POWERS = tuple(1000**i for i in range(len(_SIZE_NAMES)))
+
+
 def convert_size(size_bytes):
     if size_bytes == 0:
         return "0B"
-    size_name = ("B", "KB", "MB", "GB", "TB", "PB", "EB", "ZB", "YB")
-    i = int(math.floor(math.log(size_bytes, 1000)))
-    p = math.pow(1000, i)
-    s = int(math.ceil(size_bytes / p))
-    return "%s %s" % (s, size_name[i])
+    i = 0
+    while i + 1 < len(_SIZE_POWERS) and size_bytes >= _SIZE_POWERS[i + 1]:
+        i += 1
+    # integer ceiling division, exact for sizes of any magnitude
+    s = int(-(-size_bytes // _SIZE_POWERS[i]))
+    return "%s %s" % (s, _SIZE_NAMES[i])
 
 
 def formatUserDict(file_path):
     """Properly formats user dict before saving."""
+    lines = []
     with open(file_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-        lines = [re.sub(r"\s+", " ", line) for line in lines if line.split()]
-        lines = [
-            f"{line.split()[0].lower()}\t{' '.join(line.split()[1:])}" for line in lines
-        ]
+        for line in f:
+            parts = line.split()
+            if parts:
+                lines.append(f"{parts[0].lower()}\t{' '.join(parts[1:])}\n")
     with open(file_path, "w", encoding="utf-8") as f:
-        [f.write(line + "\n") for line in lines]
+        f.writelines(lines)
 
 
-def delete_folders(folder_path: str, search_str: str) -> None:
-    # recursively delete all folders with user id
-    if os.path.exists(folder_path):
-        for entry in os.scandir(folder_path):
-            if entry.is_dir():
-                if search_str in entry.path:
-                    if os.path.exists(entry.path):
-                        shutil.rmtree(entry.path)
-                delete_folders(entry.path, search_str)
+@lru_cache(maxsize=64)
+def _load_known_words(path, mtime):
+    """Load a language dictionary's words; `mtime` keys the cache so an
+    edited dictionary is read again"""
+    with open(path, "r", encoding="utf-8") as f:
+        return frozenset(json.load(f))
+
+
+def load_known_words(lang):
+    """Return the set of known words for `lang`, cached across uploads"""
+    path = f"{ADMIN}/{lang}/{lang}.json"
+    return _load_known_words(path, os.stat(path).st_mtime)
 
 
 def processTextGridNew(
@@ -100,67 +109,53 @@ def processTextGridNew(
         suggested = True
         logger.info("Detecting Language...")
         # get sample text from textgrid
-        sample_text = ""
-        for _, _, text in textgrid.tiers[0].entries:
-            sample_text += f"{text} "
-        logger.info(f"Sample text: {sample_text}")
+        sample_text = " ".join(entry[-1] for entry in textgrid.tiers[0].entries)
+        logger.debug("Sample text: %s", sample_text)
         lang = predict_lang(sample_text.strip(), textgrid)
 
     # load known words
     logger.info(f"LANG: {lang}")
     try:
-        with open(f"{ADMIN}/{lang}/{lang}.json", "r", encoding="utf-8") as f:
-            known_words = json.load(f)
+        known_words = load_known_words(lang)
         logger.info("known words loaded")
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(f"Failed to load known words for {lang}: {e}")
-        known_words = {}
+        known_words = frozenset()
 
     # load user words
-    user_words = None
+    user_words = frozenset()
     user_dict_path = os.path.join(UPLOADS, str(user_id), "dic", f"{lang}.json")
-
-    if os.path.exists(user_dict_path):
-        try:
-            with open(user_dict_path, "r", encoding="utf-8") as f:
-                content = f.read().strip()
-                if content:
-                    user_words = json.loads(content)
-                    logger.info("user words loaded")
-                else:
-                    user_words = None
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            logger.warning(f"Failed to load user dictionary: {e}")
-            user_words = None
-    else:
-        user_words = None
+    try:
+        with open(user_dict_path, "r", encoding="utf-8") as f:
+            content = f.read().strip()
+        if content:
+            user_words = set(json.loads(content))
+            logger.info("user words loaded")
+    except FileNotFoundError:
+        pass
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to load user dictionary: {e}")
 
     # check if multitier
     if len(textgrid.tiers) > 1:
         multitier = True
+    # bind the per-entry helpers to locals for the loop below
+    edge_colon_sub = _EDGE_COLON_RE.sub
+    add_missing = missing_words.update
     for tier in textgrid.tiers:
-        for _, _, text in tier.entries:
-            # remove all punctuation marks
-            line = re.sub(
-                r"[\.\!\?\,\"\<\>\)\(\*\{\}\[\]\¿\¡‘’‚‛“”„‟«»‹›❛❜❝❞「」『』〝〞〟﹁﹂﹃﹄]+",
-                "",
-                text,
-            )
-            line = re.sub(r":( |$)", "\\1", text)
-            line = re.sub(r"( |^):", "\\1", text)
-            line = re.sub(r"\s+", " ", text)
-            n_words += len(line.split())
-            for word in line.split():
-                if word.lower() not in known_words:
-                    if user_words != None:
-                        if word.lower() not in user_words:
-                            logger.info(f"Not in user words: {word.lower()}")
-                            missing_words.add(word.lower())
-                        else:
-                            logger.info(f"In user words: {word}")
-                    else:
-                        missing_words.add(word.lower())
-        logger.info(f"missing words in tier {tier.name}: {missing_words}")
+        # the label is the last field of both intervals and points
+        for entry in tier.entries:
+            # remove all punctuation marks and word-edge colons; split()
+            # below takes care of runs of whitespace
+            line = edge_colon_sub("", entry[-1].translate(_PUNCT_TABLE))
+            # lowercase the whole entry once and let set difference do the
+            # per-word lookups in C
+            words = line.lower().split()
+            n_words += len(words)
+            # words from either dictionary count as known; checking both
+            # sets avoids copying the cached language dictionary
+            add_missing(set(words).difference(known_words, user_words))
+        logger.debug("missing words in tier %s: %s", tier.name, missing_words)
     # Write the missing words to a missing.dict line by line
     if len(missing_words) > 0:
         logger.info("missing words > 0")
@@ -173,8 +168,12 @@ def processTextGridNew(
         else:
             logger.info("no missing words")
             f.writelines("")
-    logger.info(f"n_words: {n_words}")
-    logger.info(f"missing_words: {len(missing_words)}")
+    logger.info(
+        "%d words in %d tiers, %d missing",
+        n_words,
+        len(textgrid.tiers),
+        len(missing_words),
+    )
     return {
         "n_words": n_words,
         "missing_words": missing_words,
@@ -206,44 +205,36 @@ def predict_lang(sample_text: str, textgrid=None) -> str:
             # Check if language has alternatives
             alternatives_query = language.alternatives.all()
             if alternatives_query:
-                lang_found = {"lang": "", "n_words": False}
-                # Build alternatives list including the main language
-                alt_codes = [alt.code for alt in alternatives_query]
-                alt_codes.append(lang_id)
+                # Tokenize once; each candidate is then scored over the
+                # distinct words, weighted by how often they occur
+                token_counts = Counter(
+                    word.lower()
+                    for tier in textgrid.tiers
+                    for entry in tier.entries
+                    for word in _NONWORD_RE.sub("", entry[-1]).split()
+                )
+                # The main language goes first so it wins ties
+                alt_codes = [lang_id] + [alt.code for alt in alternatives_query]
+                best_lang, best_missing = "", math.inf
 
                 for alt_lang in alt_codes:
-                    missing_words = 0
                     try:
-                        known_words = json.load(
-                            open(
-                                f"{ADMIN}/{alt_lang}/{alt_lang}.json",
-                                "r",
-                                encoding="utf-8",
-                            )
-                        )
-                        for tier in textgrid.tiers:
-                            for _, _, text in tier.entries:
-                                text = re.sub(r"[^\w\s]", "", text)
-                                for word in text.split():
-                                    if word.lower() not in known_words:
-                                        missing_words += 1
-                        if lang_found["n_words"] is False:
-                            logger.info(
-                                f"Assigning value for the first time: {missing_words}"
-                            )
-                            lang_found["n_words"] = missing_words
-                        if missing_words <= lang_found["n_words"]:
-                            logger.info(
-                                f"{missing_words} is less than or equal to {lang_found['n_words']}"
-                            )
-                            lang_found["lang"] = alt_lang
-                        logger.info(f"PREDICTION: {lang_found}")
+                        known_words = load_known_words(alt_lang)
                     except (FileNotFoundError, json.JSONDecodeError) as e:
                         logger.warning(
                             f"Could not load language data for {alt_lang}: {e}"
                         )
                         continue
-                lang = lang_found["lang"]
+                    missing_words = sum(
+                        count
+                        for word, count in token_counts.items()
+                        if word not in known_words
+                    )
+                    logger.debug("%s: %s missing words", alt_lang, missing_words)
+                    if missing_words < best_missing:
+                        best_lang, best_missing = alt_lang, missing_words
+                logger.debug("PREDICTION: %s", best_lang)
+                lang = best_lang
             else:
                 lang = lang_id
         if lang:
@@ -302,7 +293,36 @@ def new_convert_to_wav(file):
         return new_name
 
 
+def wav_channel_count(file):
+    """Read the channel count from a WAV file's fmt chunk, or None if the
+    header can't be parsed"""
+    try:
+        with open(file, "rb") as f:
+            riff = f.read(12)
+            if riff[:4] not in (b"RIFF", b"RF64") or riff[8:12] != b"WAVE":
+                return None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                size = int.from_bytes(chunk[4:], "little")
+                if chunk[:4] == b"fmt ":
+                    fmt = f.read(4)
+                    if len(fmt) < 4:
+                        return None
+                    return int.from_bytes(fmt[2:4], "little")
+                # chunks are word aligned
+                f.seek(size + (size & 1), os.SEEK_CUR)
+    except OSError:
+        return None
+
+
 def get_audio_channel_layout(file):
+    # A WAV header answers this without spawning ffprobe
+    channels = wav_channel_count(file)
+    if channels is not None:
+        return "stereo" if channels == 2 else "mono"
+
     # Use FFprobe to get audio channel layout
     logger.info("Getting audio channel layout")
     ffprobe_command = [
@@ -323,12 +343,21 @@ def get_audio_channel_layout(file):
         return "mono"
 
 
-def replaceTextGridTranscript(cleanup_file):
-    # Read the cleanup file into a dictionary
-    encodingcl = charset_normalizer.detect(open(cleanup_file, "rb").read())
+@lru_cache(maxsize=32)
+def _load_cleanup_rules(cleanup_file, mtime):
+    """Parse a language cleanup file into its substitution rules; `mtime` keys
+    the cache so an edited file is parsed again"""
+    # A bounded sample is plenty to guess the encoding of a rules file
+    with open(cleanup_file, "rb") as f:
+        sample = f.read(65536)
+    if sample.startswith(codecs.BOM_UTF8):
+        encodingcl = {"encoding": "utf-8-sig"}
+    else:
+        encodingcl = charset_normalizer.detect(sample)
+        if not encodingcl["encoding"]:
+            encodingcl["encoding"] = "utf-8"
     if "kr" in encodingcl["encoding"].lower() or "jp" in encodingcl["encoding"].lower():
         encodingcl["encoding"] = "utf-8"
-    logger.info(f"Cleaning up using file: {cleanup_file}")
     srcList = []
     replList = []
     rsrcList = []
@@ -340,12 +369,10 @@ def replaceTextGridTranscript(cleanup_file):
                 continue
             if line == "":
                 continue
-            if len(line.split("substitute")) > 1:
-                src, repl = line.split("substitute")
-                srcList.append(src.replace('"', "").strip())
-                replList.append(repl.replace('"', "").strip())
-            if len(line.split("rsubstitute")) > 1:
-                src, repl = line.split("rsubstitute")
+            # "rsubstitute" contains "substitute", so look for it first
+            idx = line.find("rsubstitute")
+            if idx >= 0:
+                src, repl = line[:idx], line[idx + len("rsubstitute") :]
                 try:
                     src = re.compile(src.replace('"', "").strip(), re.IGNORECASE)
                     rsrcList.append(src)
@@ -353,11 +380,25 @@ def replaceTextGridTranscript(cleanup_file):
                 except re.error:
                     logger.info(f"Invalid regular expression: {src}")
                     continue
+            else:
+                idx = line.find("substitute")
+                if idx >= 0:
+                    src, repl = line[:idx], line[idx + len("substitute") :]
+                    srcList.append(src.replace('"', "").strip())
+                    replList.append(repl.replace('"', "").strip())
+    return tuple(srcList), tuple(replList), tuple(rsrcList), tuple(rreplList)
+
+
+def replaceTextGridTranscript(cleanup_file):
+    """Returns the cleanup rules of `cleanup_file` as
+    `(srcList, replList, rsrcList, rreplList)`, parsed once per file version"""
+    logger.info(f"Cleaning up using file: {cleanup_file}")
+    return _load_cleanup_rules(cleanup_file, os.stat(cleanup_file).st_mtime)
 
 
 def fileOps(file, language):
     logger.info("fileOps")
-    if isAudioFile(file):
+    if is_audio_file(file):
         file = new_convert_to_wav(file)
         logger.info(f"Wave file path is: {file}")
         # date240227optimizeAudio(file)
@@ -369,6 +410,18 @@ def fileOps(file, language):
     return file
 
 
+def _iter_files(root):
+    """Yield the path of every file under `root`"""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # Like os.walk, don't descend into symlinked directories
+                if not entry.is_symlink():
+                    yield from _iter_files(entry.path)
+            else:
+                yield entry.path
+
+
 def transcription_mode(
     file_paths: list,
     transcription_type: str,
@@ -399,11 +452,7 @@ def transcription_mode(
         os.makedirs(trans_temp_2, exist_ok=True)
         lab2TextGrid(trans_temp_1, trans_temp_2, log_file, original_dir=trans_temp_1)
         shutil.rmtree(trans_temp_1)
-        file_paths = [
-            os.path.join(root, file)
-            for root, _, files in os.walk(trans_temp_2)
-            for file in files
-        ]
+        file_paths = list(_iter_files(trans_temp_2))
         return file_paths, log_file, trans_temp_2
     elif transcription_type == "exp-b":
         trans_temp_1 = tempfile.mkdtemp()
@@ -414,73 +463,60 @@ def transcription_mode(
         os.makedirs(trans_temp_2, exist_ok=True)
         conv2TG2(trans_temp_1, trans_temp_2, log_file)
         shutil.rmtree(trans_temp_1)
-        file_paths = [
-            os.path.join(root, file)
-            for root, _, files in os.walk(trans_temp_2)
-            for file in files
-        ]
+        file_paths = list(_iter_files(trans_temp_2))
         return file_paths, log_file, trans_temp_2
     elif transcription_type == "comp-ling":
         trans_temp_1 = tempfile.mkdtemp()
         os.makedirs(trans_temp_1, exist_ok=True)
         lab2TextGrid(input_folder, trans_temp_1, log_file, original_dir)
         shutil.rmtree(input_folder)
-        file_paths = [
-            os.path.join(root, file)
-            for root, _, files in os.walk(trans_temp_1)
-            for file in files
-        ]
+        file_paths = list(_iter_files(trans_temp_1))
         return file_paths, log_file, trans_temp_1
     elif transcription_type == "var-ling":
         trans_temp_1 = tempfile.mkdtemp()
         os.makedirs(trans_temp_1, exist_ok=True)
         conv2TG2(input_folder, trans_temp_1, log_file)
         shutil.rmtree(input_folder)
-        file_paths = [
-            os.path.join(root, file)
-            for root, _, files in os.walk(trans_temp_1)
-            for file in files
-        ]
+        file_paths = list(_iter_files(trans_temp_1))
         return file_paths, log_file, trans_temp_1
     else:
         return [], log_file, input_folder
 
 
 def extract_upload_zip(zip_file: FileStorage, maintain_structure: bool = False):
+    """Returns the zip members as `FileStorage` objects. Each member is
+    streamed into an anonymous temporary file that is removed once it is
+    closed, so the returned streams stay valid after this returns"""
     files = []
     with tempfile.TemporaryDirectory() as zip_dir:
         zip_name = zip_file.filename.split("/")[-1]
         tmp_zip = os.path.join(zip_dir, zip_name)
         zip_file.save(tmp_zip)
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            with zipfile.ZipFile(tmp_zip, "r") as zip_ref:
-                for file_info in zip_ref.infolist():
-                    if (
-                        "__MACOSX" in file_info.filename
-                        or ".DS_Store" in file_info.filename
-                    ):
-                        logger.info(f"Skipping {file_info.filename}")
-                        continue
-                    if file_info.filename.endswith("/"):
-                        # Skip directory entries
-                        continue
-                    if maintain_structure:
-                        file_path = os.path.join(tmp_dir, file_info.filename)
-                        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    else:
-                        file_path = os.path.join(
-                            tmp_dir, os.path.basename(file_info.filename)
-                        )
-                    with zip_ref.open(file_info) as source, open(
-                        file_path, "wb"
-                    ) as target:
-                        # Extract and write the file content
-                        target.write(source.read())
-                    file_storage = FileStorage(
-                        open(file_path, "rb"),
-                        filename=file_path.replace(f"{tmp_dir}/", ""),
+        with zipfile.ZipFile(tmp_zip, "r") as zip_ref:
+            for file_info in zip_ref.infolist():
+                if (
+                    "__MACOSX" in file_info.filename
+                    or ".DS_Store" in file_info.filename
+                ):
+                    logger.info(f"Skipping {file_info.filename}")
+                    continue
+                if file_info.filename.endswith("/"):
+                    # Skip directory entries
+                    continue
+                if maintain_structure:
+                    # Drop empty, "." and ".." parts as ZipFile.extract does
+                    filename = "/".join(
+                        part
+                        for part in file_info.filename.split("/")
+                        if part not in ("", ".", "..")
                     )
-                    files.append(file_storage)
+                else:
+                    filename = os.path.basename(file_info.filename)
+                target = tempfile.TemporaryFile()
+                with zip_ref.open(file_info) as source:
+                    shutil.copyfileobj(source, target, 1 << 20)
+                target.seek(0)
+                files.append(FileStorage(target, filename=filename))
     logger.info(f"EXTRACTED {len(files)} FILES")
     return files
 
@@ -580,7 +616,7 @@ def uploaderOps(
             for file in fileGroup:
                 p = os.path.basename(file)
                 logger.info(f"filename is: {p}")
-                audio_ext = isAudioFile(p)
+                audio_ext = is_audio_file(p)
                 if audio_ext != False:
                     num_wavs += 1
                     wav_files.append(os.path.splitext(p)[0])
@@ -670,6 +706,7 @@ def uploaderOps(
         batch_update_task("lang_id", lang_record.id)
         batch_update_task("engine_id", engine_record.id)
 
+        conversions = []
         for fileGroup in files:
             missing_dict_path = os.path.join(
                 UPLOADS, str(user_id), "dic", "missing", "missing.dict"
@@ -719,7 +756,7 @@ def uploaderOps(
                     apply_task_updates()
                     return response
                 logger.info(p)
-                audio_ext = isAudioFile(p)
+                audio_ext = is_audio_file(p)
                 if not audio_ext:
                     # original TextGrid file path
                     orig_p = file.replace(f"{final_temp}/", "")
@@ -793,17 +830,19 @@ def uploaderOps(
                     os.makedirs(os.path.dirname(file_path), exist_ok=True)
                     logger.info(f"wav filename: {file_path}")
                     shutil.copy(file, file_path)
-                    file_path = fileOps(file_path, lang)
+                    # Converted after the loop, which fills in the final path
+                    audio_file = TaskFile(
+                        task_id=task.id,
+                        file_type=FileType.AUDIO,
+                        file_path=file_path,
+                        file_key=file_id,
+                    )
+                    conversions.append(
+                        (audio_file, processed_paths, len(processed_paths))
+                    )
                     processed_paths.append(file_path)
                     # Queue audio file record for batch insert
-                    task_files_to_insert.append(
-                        TaskFile(
-                            task_id=task.id,
-                            file_type=FileType.AUDIO,
-                            file_path=file_path,
-                            file_key=file_id,
-                        )
-                    )
+                    task_files_to_insert.append(audio_file)
 
             task_paths.append(processed_paths)
             logger.info(
@@ -834,6 +873,18 @@ def uploaderOps(
             if os.path.exists(missing_path_temp):
                 shutil.rmtree(missing_path_temp)
 
+        # ffmpeg runs out of process, so threads are enough to overlap the
+        # audio conversions
+        if conversions:
+            workers = min(len(conversions), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as converter:
+                converted = converter.map(
+                    new_convert_to_wav,
+                    [audio_file.file_path for audio_file, _, _ in conversions],
+                )
+                for (audio_file, paths, index), wav_path in zip(conversions, converted):
+                    audio_file.file_path = paths[index] = wav_path
+
         # Batch update task with new fields
         batch_update_task("missing_words", len(missing_words))
         batch_update_task("missingprondict", final_path)
@@ -20,7 +20,6 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app
-from app.extensions import db
 from app.utils.logger import get_logger
 from app.models import Task, User, Captcha, TaskFile, TaskStatus
 from app.utils.helpers import (
@@ -152,9 +151,7 @@ def delete_unknown():
     logger.info("Deleting unknown directories...")
     with app.app_context():
         # Get all non-deleted user UUIDs
-        users = User.query.filter(
-            db.or_(User.deleted.is_(None), User.deleted == "")
-        ).all()
+        users = User.query.filter(User.deleted.is_(None)).all()
         user_uuids = [user.uuid for user in users]
 
         # Check uploads directory
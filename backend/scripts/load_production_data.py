@@ -31,6 +31,7 @@ from app.models.language import Language
 from app.models.user import User
 from app.models.task import Task, TaskStatus, TaskFile, TaskFileName, FileType
 from app.utils.logger import get_logger
+from app.utils.datetime_helpers import UNKNOWN_DELETED_AT, parse_legacy_deleted
 
 logger = get_logger(__name__)
 
@@ -79,6 +80,20 @@ class ProductionDataLoader:
             logger.warning(f"Failed to parse date '{date_str}': {e}")
             return None
 
+    def _parse_deleted(self, value: Any) -> Optional[datetime]:
+        """Parse a legacy user deletion marker to a timezone-aware datetime.
+        A marker that can't be parsed keeps the user deleted."""
+        if not value:
+            return None
+        if isinstance(value, dict):
+            deleted = self.parse_mongo_date(value)
+        else:
+            deleted = parse_legacy_deleted(value)
+        if deleted is None or deleted == UNKNOWN_DELETED_AT:
+            logger.warning(f"Unrecognised deleted date '{value}', keeping user deleted")
+            return UNKNOWN_DELETED_AT
+        return deleted
+
     def _safe_int(self, value: Any) -> Optional[int]:
         """Safely convert value to int"""
         if value is None or value == "":
@@ -173,7 +188,7 @@ class ProductionDataLoader:
                     "org": user_data.get("org"),
                     "industry": user_data.get("industry"),
                     "admin": user_data.get("admin", False),
-                    "deleted": user_data.get("deleted", "") or None,
+                    "deleted": self._parse_deleted(user_data.get("deleted")),
                     "password_hash": user_data.get(
                         "password", ""
                     ),  # Note: keeping existing hash
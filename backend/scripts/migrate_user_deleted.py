@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Convert users.deleted from its legacy string column to a DateTime.
+
+Empty markers become NULL and date strings are parsed into timestamps before
+the column type is changed, so active users keep matching
+`User.deleted.is_(None)`. Markers that can't be parsed are set to
+UNKNOWN_DELETED_AT so those accounts stay deleted.
+This script can be run multiple times safely - it does nothing once the
+column is a DateTime.
+
+Usage:
+    python scripts/migrate_user_deleted.py [--dry-run]
+"""
+
+import os
+import sys
+import argparse
+from datetime import timezone
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.extensions import db
+from app.utils.datetime_helpers import UNKNOWN_DELETED_AT, parse_legacy_deleted
+
+
+def convert_deleted_values(conn):
+    """Rewrite every legacy marker as NULL or a "%Y-%m-%d %H:%M:%S" UTC string
+    that the database can cast to a DateTime. Returns the rewritten rows and
+    the markers that couldn't be parsed."""
+    rows = conn.execute(
+        sa.text("SELECT id, deleted FROM users WHERE deleted IS NOT NULL")
+    ).all()
+
+    updates = []
+    unparsed = []
+    for user_id, value in rows:
+        deleted = parse_legacy_deleted(value)
+        if deleted == UNKNOWN_DELETED_AT:
+            unparsed.append((user_id, value))
+        updates.append(
+            {
+                "id": user_id,
+                "deleted": (
+                    deleted.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+                    if deleted
+                    else None
+                ),
+            }
+        )
+    return updates, unparsed
+
+
+def migrate(engine, dry_run=False):
+    with engine.begin() as conn:
+        columns = {c["name"]: c for c in sa.inspect(conn).get_columns("users")}
+        if isinstance(columns["deleted"]["type"], sa.DateTime):
+            print("users.deleted is already a DateTime, nothing to do")
+            return
+
+        updates, unparsed = convert_deleted_values(conn)
+        cleared = sum(1 for row in updates if row["deleted"] is None)
+        print(f"{len(updates) - cleared} deletion dates to convert")
+        print(f"{cleared} empty markers to clear")
+        for user_id, value in unparsed:
+            print(f"User {user_id}: unrecognised marker {value!r} kept as deleted")
+
+        if dry_run:
+            print("[DRY RUN] No changes made")
+            conn.rollback()
+            return
+
+        if updates:
+            conn.execute(
+                sa.text("UPDATE users SET deleted = :deleted WHERE id = :id"),
+                updates,
+            )
+
+        if conn.dialect.name == "sqlite":
+            # SQLite columns aren't typed; casting would turn the dates into
+            # integers, and SQLAlchemy reads the rewritten strings as they are
+            print("users.deleted values converted, column type left as is")
+            return
+
+        op = Operations(MigrationContext.configure(conn))
+        op.alter_column(
+            "users",
+            "deleted",
+            existing_type=columns["deleted"]["type"],
+            type_=sa.DateTime(timezone=True),
+            existing_nullable=True,
+            postgresql_using="deleted::timestamptz",
+        )
+        print("users.deleted is now a DateTime")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert users.deleted from a string to a DateTime column"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report what would change without touching the database",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        migrate(db.engine, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import pytest
+
+from app.utils.transcription.conv2functions import convert_tsv_to_tsv
+
+
+def convert(tmp_path, content):
+    tsv_file = tmp_path / "input.tsv"
+    output_file = tmp_path / "output.txt"
+    tsv_file.write_text(content, encoding="utf-8")
+    convert_tsv_to_tsv(str(tsv_file), str(output_file))
+    return tsv_file, output_file
+
+
+def test_three_columns_use_default_tier(tmp_path):
+    _, output_file = convert(tmp_path, "0.0\t1.5\thello\n1.5\t2.0\tworld\n")
+
+    assert output_file.read_text() == (
+        "transcription\t0.0\t1.5\thello\ntranscription\t1.5\t2.0\tworld\n"
+    )
+
+
+def test_five_columns_skip_first(tmp_path):
+    _, output_file = convert(tmp_path, "id\tspeaker\t0\t1\thello\n")
+
+    assert output_file.read_text() == "speaker\t0\t1\thello\n"
+
+
+def test_short_rows_are_padded(tmp_path):
+    _, output_file = convert(tmp_path, "tier\t0\t1\thello\ntier\t1\t2\n")
+
+    assert output_file.read_text() == "tier\t0\t1\thello\ntier\t1\t2\t\n"
+
+
+def test_blank_lines_and_trailing_whitespace(tmp_path):
+    tsv_file, output_file = convert(
+        tmp_path, "tier\t0\t1\thello \t\n\n  \ntier\t1\t2\tbye\n"
+    )
+
+    assert output_file.read_text() == "tier\t0\t1\thello\ntier\t1\t2\tbye\n"
+    # The input is rewritten with its lines stripped
+    assert (
+        tsv_file.read_text(encoding="utf-8") == "tier\t0\t1\thello\n\n\ntier\t1\t2\tbye"
+    )
+
+
+def test_quoted_fields_keep_embedded_tabs(tmp_path):
+    _, output_file = convert(tmp_path, 'tier\t0\t1\t"hello\tthere"\n')
+
+    assert output_file.read_text() == "tier\t0\t1\thello\tthere\n"
+
+
+def test_consistently_quoted_column_is_unquoted(tmp_path):
+    _, output_file = convert(
+        tmp_path, 'tier\t0\t1\t"""hello"""\ntier\t1\t2\t"""world"""\n'
+    )
+
+    assert output_file.read_text() == "tier\t0\t1\thello\ntier\t1\t2\tworld\n"
+
+
+def test_partly_quoted_column_keeps_quotes(tmp_path):
+    _, output_file = convert(tmp_path, 'tier\t0\t1\t"""hello"""\ntier\t1\t2\tworld\n')
+
+    assert output_file.read_text() == 'tier\t0\t1\t"hello"\ntier\t1\t2\tworld\n'
+
+
+def test_wider_row_is_skipped(tmp_path):
+    _, output_file = convert(tmp_path, "tier\t0\t1\thello\ntier\t1\t2\tbye\textra\n")
+
+    assert not output_file.exists()
+
+
+def test_end_before_start_is_rejected(tmp_path):
+    with pytest.raises(Exception, match="end_time"):
+        convert(tmp_path, "tier\t1\t0\thello\n")
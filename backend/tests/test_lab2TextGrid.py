@@ -0,0 +1,46 @@
+import pytest
+from praatio import textgrid
+from praatio.utilities.constants import Interval
+
+from app.utils.transcription.lab2TextGrid import write_textgrid
+
+
+def praatio_textgrid(path, start_time, end_time, transcription):
+    """Write the TextGrid the way lab2TextGrid did before write_textgrid"""
+    tg = textgrid.Textgrid()
+    tier = textgrid.IntervalTier(
+        name="transcription",
+        entries=[Interval(start_time, end_time, transcription)],
+        minT=start_time,
+        maxT=end_time,
+    )
+    tg.addTier(tier)
+    tg.save(fn=str(path), format="long_textgrid", includeBlankSpaces=True)
+
+
+@pytest.mark.parametrize(
+    "start_time, end_time, transcription",
+    [
+        (0, 3, "hello world"),
+        (0.0, 2.0, "whole seconds as floats"),
+        (0.0, 1.2345678901234567, "long fraction"),
+        (0.25, 10.5, 'she said "hi"'),
+        (0.0, 0.1 + 0.2, "rounding noise"),
+        (1e-05, 12345.678, "tiny start"),
+        (0.0, 4.0, "åäö ŋ ɪ ʃ ǂ"),
+        (0.0, 1.5, ""),
+    ],
+)
+def test_write_textgrid_matches_praatio(tmp_path, start_time, end_time, transcription):
+    expected = tmp_path / "praatio.TextGrid"
+    actual = tmp_path / "written.TextGrid"
+
+    praatio_textgrid(expected, start_time, end_time, transcription)
+    write_textgrid(str(actual), start_time, end_time, transcription)
+
+    assert actual.read_bytes() == expected.read_bytes()
+
+
+def test_write_textgrid_rejects_empty_interval(tmp_path):
+    with pytest.raises(ValueError):
+        write_textgrid(str(tmp_path / "empty.TextGrid"), 1.0, 1.0, "text")